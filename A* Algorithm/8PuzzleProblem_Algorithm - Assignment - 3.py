@@ -1,46 +1,145 @@
 import heapq
-from collections import deque
+import math
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import tempfile
+import time
+from collections import OrderedDict, deque
+
+# Board geometry for an N x N puzzle, precomputed once per board size: cell coordinates,
+# the blank moves from each cell as (new blank position, action), and the number of
+# bits per tile in the packed encoding.
+class BoardGeometry:
+    def __init__(self, width):
+        self.width = width
+        self.size = width * width
+        self.tile_bits = max(4, (self.size - 1).bit_length())
+        self.tile_mask = (1 << self.tile_bits) - 1
+        self.coordinates = [divmod(position, width) for position in range(self.size)]
+        self.centre = self.size // 2 if width % 2 == 1 else None
+        self.moves = []
+        for x, y in self.coordinates:
+            self.moves.append([(nx * width + ny, action)
+                               for nx, ny, action in ((x + 1, y, "Down"), (x - 1, y, "Up"), (x, y + 1, "Right"), (x, y - 1, "Left"))
+                               if 0 <= nx < width and 0 <= ny < width])
+
+geometries = {}
+
+def board_geometry(size):
+    # Geometry of a board with `size` cells (9 for the 8-puzzle, 16 for the 15-puzzle, ...)
+    geometry = geometries.get(size)
+    if geometry is None:
+        width = math.isqrt(size)
+        if width * width != size:
+            raise ValueError(f"A board of {size} cells is not square")
+        geometry = geometries[size] = BoardGeometry(width)
+    return geometry
+
+# Compact board encoding: the board is packed into one integer with tile_bits bits per
+# tile (4 up to the 15-puzzle), the tile at position i in bits tile_bits*i and up, so a
+# move is a few bit operations.
+def encode_board(board):
+    bits = board_geometry(len(board)).tile_bits
+    code = 0
+    for position, tile in enumerate(board):
+        code |= tile << (bits * position)
+    return code
+
+def decode_board(code, length=9):
+    geometry = board_geometry(length)
+    bits, mask = geometry.tile_bits, geometry.tile_mask
+    return [(code >> (bits * position)) & mask for position in range(length)]
+
+def is_solvable(board, goal):
+    # Every move swaps the blank with a tile (one transposition) and moves the blank one
+    # cell, so the parity of the permutation from board to goal always equals the parity
+    # of the blank's distance to its goal cell. Checked in O(n) by counting cycles.
+    geometry = board_geometry(len(goal))
+    positions = goal_positions(goal)
+    seen = bytearray(len(board))
+    cycles = 0
+    for start in range(len(board)):
+        if not seen[start]:
+            cycles += 1
+            position = start
+            while not seen[position]:
+                seen[position] = 1
+                position = positions[board[position]]
+    blank_x, blank_y = geometry.coordinates[board.index(0)]
+    goal_x, goal_y = geometry.coordinates[positions[0]]
+    return (len(board) - cycles) % 2 == (abs(blank_x - goal_x) + abs(blank_y - goal_y)) % 2
 
 #This problem is formulated as a state space search problem
 class PuzzleState:
+    __slots__ = ('code', 'blank', 'geometry', 'parent', 'action', 'cost', 'h', 'h_function', 'h_goal')
+
     #Representation for the states and nodes
-    def __init__(self, board, parent=None, action=None, cost=0):
+    def __init__(self, board, parent=None, action=None, cost=0, blank=None, geometry=None):
         # Parameters:
-        # board: The current configuration of the puzzle.
+        # board: The current configuration of the puzzle, as a list or an encoded integer.
         # parent: The parent state from which this state was generated.
         # action: The move that led to this state.
         # cost: The cost to reach this state from the start state.
+        # blank: The blank position, if already known.
+        # geometry: The BoardGeometry of an encoded board (taken from the parent, or 3x3 by default).
         
-        self.board = board
+        if isinstance(board, int):
+            if geometry is None:
+                geometry = parent.geometry if parent is not None else board_geometry(9)
+            self.code = board
+            self.geometry = geometry
+            self.blank = blank if blank is not None else decode_board(board, geometry.size).index(0)
+        else:
+            self.code = encode_board(board)
+            self.geometry = board_geometry(len(board))
+            self.blank = board.index(0)
         self.parent = parent
         self.action = action
         self.cost = cost
+        # Heuristic value carried on the state: h_function(self, h_goal) == h, where h_goal
+        # is the goal's contents as a tuple
+        self.h = 0
+        self.h_function = None
+        self.h_goal = None
+
+    @property
+    def board(self):
+        return decode_board(self.code, self.geometry.size)
 
     def __lt__(self, other):
         return self.cost < other.cost
 
     def is_goal(self, goal):
-        return self.board == goal
+        return self.code == (goal if isinstance(goal, int) else encode_board(goal))
 
     def get_blank_position(self):
-        return self.board.index(0)
+        return self.blank
 
     def generate_children(self):
         # Generate all possible child states from the current state by sliding a tile into the blank space.
+        # The tile at the new blank position moves to the old one, which holds 0 in the code.
+        # If this state carries an incrementally updatable heuristic value, each child gets
+        # its value from the single moved tile's delta.
         # Returns: A list of child PuzzleState objects.
         
         children = []
-        blank_pos = self.get_blank_position()
-        moves = [(1, 0, "Down"), (-1, 0, "Up"), (0, 1, "Right"), (0, -1, "Left")]
-        x, y = divmod(blank_pos, 3)
-
-        for dx, dy, action in moves:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < 3 and 0 <= ny < 3:
-                new_blank_pos = nx * 3 + ny
-                new_board = self.board[:]
-                new_board[blank_pos], new_board[new_blank_pos] = new_board[new_blank_pos], new_board[blank_pos]
-                children.append(PuzzleState(new_board, self, action))
+        code, blank_pos, geometry = self.code, self.blank, self.geometry
+        bits, mask = geometry.tile_bits, geometry.tile_mask
+        delta = HEURISTIC_DELTAS.get(self.h_function)
+        if delta is not None:
+            positions = goal_positions(self.h_goal)
+        for new_blank_pos, action in geometry.moves[blank_pos]:
+            tile = (code >> (bits * new_blank_pos)) & mask
+            new_code = code ^ (tile << (bits * new_blank_pos)) ^ (tile << (bits * blank_pos))
+            child = PuzzleState(new_code, self, action, blank=new_blank_pos, geometry=geometry)
+            if delta is not None:
+                child.h = self.h + delta(self.h_goal, positions, tile, new_blank_pos, blank_pos)
+                child.h_function = self.h_function
+                child.h_goal = self.h_goal
+            children.append(child)
 
         return children
 
@@ -51,9 +150,10 @@ class PuzzleState:
         self.print_board()
 
     def print_board(self):
-        # Print the current board configuration in a 3x3 grid format.
-        for i in range(3):
-            print(self.board[i*3:(i+1)*3])
+        # Print the current board configuration in an N x N grid format.
+        board, width = self.board, self.geometry.width
+        for i in range(width):
+            print(board[i*width:(i+1)*width])
         print("\n")
 
     def get_move_count(self):
@@ -63,91 +163,572 @@ class PuzzleState:
         return 1 + self.parent.get_move_count()
     
 # Breadth-First Search (BFS) - Uninformed Search Strategy
-def bfs(start, goal):
+def bfs(start, goal, stats=None, verbose=True):
+    # stats: optional dict that receives the number of nodes expanded and the peak frontier size.
+    # verbose: print the solution; batch runs turn it off.
+    if not is_solvable(start.board, goal):
+        if verbose:
+            print("The goal state cannot be reached from this start state")
+        return None
+
     frontier = deque([start])
     explored = set()
+    nodes_expanded = 0
+    peak_frontier = 1
 
     while frontier:
         current = frontier.popleft()
 
         if current.is_goal(goal):
-            current.print_solution()
             move_count = current.get_move_count()
-            print(f"Number of moves: {move_count}")
+            if verbose:
+                current.print_solution()
+                print(f"Number of moves: {move_count}")
+            if stats is not None:
+                stats.update(nodes_expanded=nodes_expanded, peak_frontier=peak_frontier)
             return move_count
 
-        explored.add(tuple(current.board))
+        explored.add(current.code)
+        nodes_expanded += 1
 
         for child in current.generate_children():
-            if tuple(child.board) not in explored:
+            if child.code not in explored:
                 frontier.append(child)
+        peak_frontier = max(peak_frontier, len(frontier))
+
+# Goal position of every tile, cached by the goal's contents for the most recently used goals
+goal_position_cache = OrderedDict()
+GOAL_POSITION_CACHE_SIZE = 16
+
+def goal_positions(goal):
+    key = tuple(goal)
+    positions = goal_position_cache.get(key)
+    if positions is not None:
+        goal_position_cache.move_to_end(key)
+        return positions
+    positions = [0] * len(goal)
+    for position, tile in enumerate(goal):
+        positions[tile] = position
+    positions = tuple(positions)
+    goal_position_cache[key] = positions
+    if len(goal_position_cache) > GOAL_POSITION_CACHE_SIZE:
+        goal_position_cache.popitem(last=False)
+    return positions
+
+# A heuristic value carried on a state can be reused if it was computed by the same
+# function for a goal with the same contents (so a goal list changed in place is not
+# matched); the children then get theirs by adding a delta.
+def carried_heuristic(state, function, goal):
+    if state.h_function is function and state.h_goal == tuple(goal):
+        return state.h
+    return None
+
+def carry_heuristic(state, function, goal, value):
+    state.h = value
+    state.h_function = function
+    state.h_goal = tuple(goal)
+    return value
 
 # Manhattan Distance as a heuristic
 def manhattan_distance(state, goal):
+    value = carried_heuristic(state, manhattan_distance, goal)
+    if value is not None:
+        return value
     distance = 0
-    for i in range(1, 9):
-        current_pos = state.board.index(i)
-        goal_pos = goal.index(i)
-        current_x, current_y = divmod(current_pos, 3)
-        goal_x, goal_y = divmod(goal_pos, 3)
-        distance += abs(current_x - goal_x) + abs(current_y - goal_y)
-    return distance
+    board = state.board
+    positions = goal_positions(goal)
+    coordinates = state.geometry.coordinates
+    for current_pos, tile in enumerate(board):
+        if tile != 0:
+            current_x, current_y = coordinates[current_pos]
+            goal_x, goal_y = coordinates[positions[tile]]
+            distance += abs(current_x - goal_x) + abs(current_y - goal_y)
+    return carry_heuristic(state, manhattan_distance, goal, distance)
+
+# Deltas take the goal and its goal_positions, looked up once per expansion (or search)
+def manhattan_delta(goal, positions, tile, from_pos, to_pos):
+    # Change in Manhattan distance when tile moves from from_pos to to_pos
+    coordinates = board_geometry(len(goal)).coordinates
+    goal_x, goal_y = coordinates[positions[tile]]
+    from_x, from_y = coordinates[from_pos]
+    to_x, to_y = coordinates[to_pos]
+    return (abs(to_x - goal_x) + abs(to_y - goal_y)) - (abs(from_x - goal_x) + abs(from_y - goal_y))
 
 # Out-of-sequence as a heuristic
+def out_of_sequence_score(position, tile, goal):
+    # Score of one position: 1 if the centre (odd widths only) is wrong, 2 for a misplaced
+    # tile elsewhere (the last position is not scored)
+    if position == board_geometry(len(goal)).centre:
+        return 1 if tile != goal[position] else 0
+    if position < len(goal) - 1 and tile != 0 and tile != goal[position]:
+        return 2
+    return 0
+
 def out_of_sequence(state, goal):
+    value = carried_heuristic(state, out_of_sequence, goal)
+    if value is not None:
+        return value
     score = 0
-    for i in range(8):
-        if i == 4:  
-            if state.board[i] != goal[i]:
-                score += 1
-        elif state.board[i] != 0 and state.board[i] != goal[i]:
-            score += 2
-    return score
+    board = state.board
+    for i in range(len(goal) - 1):
+        score += out_of_sequence_score(i, board[i], goal)
+    return carry_heuristic(state, out_of_sequence, goal, score)
+
+def out_of_sequence_delta(goal, positions, tile, from_pos, to_pos):
+    # Only the two positions swapped by the move change their score
+    return (out_of_sequence_score(to_pos, tile, goal) + out_of_sequence_score(from_pos, 0, goal)
+            - out_of_sequence_score(to_pos, 0, goal) - out_of_sequence_score(from_pos, tile, goal))
+
+HEURISTIC_DELTAS = {manhattan_distance: manhattan_delta, out_of_sequence: out_of_sequence_delta}
 
 # Greedy Best-First Search
-def greedy_best_first_search(start, goal, heuristic):
+def greedy_best_first_search(start, goal, heuristic, stats=None, verbose=True):
+    if not is_solvable(start.board, goal):
+        if verbose:
+            print("The goal state cannot be reached from this start state")
+        return None
+
     frontier = []
     heapq.heappush(frontier, (heuristic(start, goal), start))
     explored = set()
+    nodes_expanded = 0
+    peak_frontier = 1
 
     while frontier:
         _, current = heapq.heappop(frontier)
 
         if current.is_goal(goal):
-            current.print_solution()
             move_count = current.get_move_count()
-            print(f"Number of moves: {move_count}")
+            if verbose:
+                current.print_solution()
+                print(f"Number of moves: {move_count}")
+            if stats is not None:
+                stats.update(nodes_expanded=nodes_expanded, peak_frontier=peak_frontier)
             return move_count
 
-        explored.add(tuple(current.board))
+        explored.add(current.code)
+        nodes_expanded += 1
 
         for child in current.generate_children():
-            if tuple(child.board) not in explored:
+            if child.code not in explored:
                 heapq.heappush(frontier, (heuristic(child, goal), child))
+        peak_frontier = max(peak_frontier, len(frontier))
 
 # A* Search 
-def a_star_search(start, goal, heuristic):
+def a_star_search(start, goal, heuristic, stats=None, verbose=True):
+    # best_g holds the cheapest known cost of every generated state, and a child is only
+    # pushed when it improves on it. A state is expanded at most once: heap entries for
+    # states that are already closed are stale and skipped when popped.
+    # stats: optional dict that receives the number of nodes expanded and the peak frontier size.
+    if not is_solvable(start.board, goal):
+        if verbose:
+            print("The goal state cannot be reached from this start state")
+        return None
+
+    start.cost = 0
     frontier = []
     heapq.heappush(frontier, (heuristic(start, goal), start))
-    explored = set()
+    best_g = {start.code: 0}
+    closed = set()
+    nodes_expanded = 0
+    peak_frontier = 1
 
     while frontier:
         _, current = heapq.heappop(frontier)
 
+        if current.code in closed:
+            continue
+
         if current.is_goal(goal):
-            current.print_solution()
             move_count = current.get_move_count()
-            print(f"Number of moves: {move_count}")
+            if verbose:
+                current.print_solution()
+                print(f"Number of moves: {move_count}")
+                print(f"Nodes expanded: {nodes_expanded}, Peak frontier size: {peak_frontier}")
+            if stats is not None:
+                stats.update(nodes_expanded=nodes_expanded, peak_frontier=peak_frontier)
             return move_count
 
-        explored.add(tuple(current.board))
+        closed.add(current.code)
+        nodes_expanded += 1
 
+        new_cost = current.cost + 1
         for child in current.generate_children():
-            new_cost = current.cost + 1
-            if tuple(child.board) not in explored or new_cost < child.cost:
-                child.cost = new_cost
-                priority = new_cost + heuristic(child, goal)
-                heapq.heappush(frontier, (priority, child))
+            if child.code in closed or new_cost >= best_g.get(child.code, new_cost + 1):
+                continue
+            best_g[child.code] = new_cost
+            child.cost = new_cost
+            priority = new_cost + heuristic(child, goal)
+            heapq.heappush(frontier, (priority, child))
+        peak_frontier = max(peak_frontier, len(frontier))
+
+# IDA* Search
+def ida_star_search(start, goal, heuristic, stats=None, verbose=True):
+    # Depth-first searches bounded by f = g + h, raising the bound to the smallest f that
+    # exceeded it, until the goal is reached. Moves are applied to a single board in place
+    # and undone on return, the move that undoes the previous one is skipped, and only
+    # the current path is kept, so memory is O(solution depth). Heuristics with a delta
+    # in HEURISTIC_DELTAS are updated per move in O(1); others are evaluated per node.
+    # stats: optional dict that receives nodes expanded, the deepest path (its "frontier"),
+    # iterations and the action list.
+    if not is_solvable(start.board, goal):
+        if verbose:
+            print("The goal state cannot be reached from this start state")
+        return None
+
+    board = start.board
+    geometry = start.geometry
+    bits, moves = geometry.tile_bits, geometry.moves
+    goal_code = encode_board(goal)
+    delta = HEURISTIC_DELTAS.get(heuristic)
+    positions = goal_positions(goal)
+    actions = []
+    nodes_expanded = 0
+    deepest = 0
+    found = -1
+
+    def search(code, blank, previous_blank, g, h, bound):
+        nonlocal nodes_expanded, deepest
+        f = g + h
+        if f > bound:
+            return f
+        if code == goal_code:
+            return found
+        nodes_expanded += 1
+        deepest = max(deepest, g + 1)
+
+        minimum = math.inf
+        for new_blank, action in moves[blank]:
+            if new_blank == previous_blank:
+                continue
+            tile = board[new_blank]
+            board[blank], board[new_blank] = tile, 0
+            new_code = code ^ (tile << (bits * new_blank)) ^ (tile << (bits * blank))
+            if delta is not None:
+                new_h = h + delta(goal, positions, tile, new_blank, blank)
+            else:
+                new_h = heuristic(PuzzleState(new_code, blank=new_blank, geometry=geometry), goal)
+            actions.append(action)
+
+            t = search(new_code, new_blank, blank, g + 1, new_h, bound)
+            if t == found:
+                return found
+            actions.pop()
+            board[blank], board[new_blank] = 0, tile
+            minimum = min(minimum, t)
+        return minimum
+
+    start_h = heuristic(PuzzleState(start.code, blank=start.blank, geometry=geometry), goal)
+    bound = start_h
+    iterations = 0
+    while True:
+        iterations += 1
+        t = search(start.code, start.blank, -1, 0, start_h, bound)
+        if t == found:
+            break
+        if t == math.inf:
+            return None
+        bound = t
+
+    # Rebuild the chain of states along the solution only, to print it like the other searches
+    current = PuzzleState(start.code, blank=start.blank, geometry=geometry)
+    for action in actions:
+        current = next(child for child in current.generate_children() if child.action == action)
+    move_count = current.get_move_count()
+    if verbose:
+        current.print_solution()
+        print(f"Number of moves: {move_count}")
+        print(f"Nodes expanded: {nodes_expanded}, Iterations: {iterations}")
+    if stats is not None:
+        stats.update(nodes_expanded=nodes_expanded, peak_frontier=deepest, iterations=iterations, actions=actions)
+    return move_count
+
+# Additive Pattern Databases
+# A pattern database stores, for every placement of a group of pattern tiles, the exact
+# number of moves of those tiles needed to bring them home (moves of other tiles are
+# free). With disjoint groups no move is counted twice, so the databases add up to an
+# admissible heuristic. Entries are bytes indexed by the rank of the pattern tiles'
+# cells as a partial permutation, which is a perfect hash of the placement.
+
+PDB_MAGIC = b'PDB2'  # Header, then the goal (n bytes), the tiles (k bytes) and the table
+PDB_HEADER = struct.Struct('<4s2H')
+
+def partial_permutations(n, k):
+    # Number of ordered placements of k distinct tiles on n cells
+    count = 1
+    for i in range(k):
+        count *= n - i
+    return count
+
+def rank_positions(positions, n):
+    # Lexicographic rank of distinct cells among all ordered placements on n cells, in O(k)
+    rank = 0
+    used = 0
+    for i, position in enumerate(positions):
+        smaller = bin(used & ((1 << position) - 1)).count('1')
+        rank = rank * (n - i) + position - smaller
+        used |= 1 << position
+    return rank
+
+class PatternDatabase:
+    def __init__(self, tiles, table, n, goal):
+        self.tiles = tuple(tiles)
+        self.table = table  # bytearray, or a memoryview of a mapped file
+        self.n = n
+        self.goal = tuple(goal)  # The distances are only valid towards this goal
+
+    def lookup(self, tile_positions):
+        # tile_positions[t] is the cell of tile t
+        return self.table[rank_positions([tile_positions[tile] for tile in self.tiles], self.n)]
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(PDB_HEADER.pack(PDB_MAGIC, self.n, len(self.tiles)))
+            file.write(bytes(self.goal))
+            file.write(bytes(self.tiles))
+            file.write(self.table)
+
+def build_pattern_database(tiles, goal):
+    # Backward breadth-first search from the goal over (pattern cells, blank cell) states.
+    # Moving a pattern tile costs 1 and any other move costs 0, so this is a 0-1 BFS;
+    # a state's cost is final when it is first popped.
+    n, k = len(goal), len(tiles)
+    neighbors = [[cell for cell, _ in moves] for moves in board_geometry(n).moves]
+    table = bytearray(b'\xff') * partial_permutations(n, k)
+    seen = bytearray(partial_permutations(n, k + 1))
+    start = tuple(goal.index(tile) for tile in tiles) + (goal.index(0),)
+    queue = deque([(start, 0)])
+
+    while queue:
+        state, cost = queue.popleft()
+        rank = rank_positions(state, n)
+        if seen[rank]:
+            continue
+        seen[rank] = 1
+        placement = rank_positions(state[:k], n)
+        if cost < table[placement]:
+            table[placement] = cost
+
+        blank = state[k]
+        for cell in neighbors[blank]:
+            if cell in state[:k]:
+                moved = list(state)
+                moved[state.index(cell)] = blank
+                moved[k] = cell
+                queue.append((tuple(moved), cost + 1))
+            else:
+                queue.appendleft((state[:k] + (cell,), cost))
+
+    return PatternDatabase(tiles, table, n, goal)
+
+def load_pattern_database(path, goal=None):
+    # Memory-maps a saved database, so loading is O(1) and lookups read the file's pages.
+    # With a goal, a database built for another goal is rejected.
+    with open(path, 'rb') as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, n, k = PDB_HEADER.unpack_from(data)
+    if magic != PDB_MAGIC:
+        raise ValueError(f"{path} is not a pattern database file")
+    saved_goal = tuple(data[PDB_HEADER.size:PDB_HEADER.size + n])
+    if goal is not None and saved_goal != tuple(goal):
+        raise ValueError(f"{path} was built for the goal {list(saved_goal)}, not {list(goal)}")
+    tiles = data[PDB_HEADER.size + n:PDB_HEADER.size + n + k]
+    return PatternDatabase(tiles, memoryview(data)[PDB_HEADER.size + n + k:], n, saved_goal)
+
+class PatternDatabaseHeuristic:
+    # Sum of disjoint pattern databases, used like the other heuristics: heuristic(state, goal).
+    # The databases must have been built for the goal they are asked about.
+    def __init__(self, databases):
+        goals = {database.goal for database in databases}
+        if len(goals) > 1:
+            raise ValueError("The pattern databases were built for different goals")
+        self.databases = databases
+        self.goal = goals.pop() if goals else None
+
+    def __call__(self, state, goal):
+        if self.goal is not None and tuple(goal) != self.goal:
+            raise ValueError(f"The pattern databases were built for the goal {list(self.goal)}, not {list(goal)}")
+        tile_positions = [0] * len(goal)
+        for position, tile in enumerate(state.board):
+            tile_positions[tile] = position
+        return sum(database.lookup(tile_positions) for database in self.databases)
+
+def additive_pattern_heuristic(goal, groups, directory=None):
+    # Builds one database per group of tiles, or loads it from directory if it has
+    # been built and saved there before
+    databases = []
+    for tiles in groups:
+        path = None
+        if directory is not None:
+            name = "-".join(map(str, goal)) + "_" + "-".join(map(str, tiles))
+            path = os.path.join(directory, f"pdb_{name}.bin")
+        if path is not None and os.path.exists(path):
+            databases.append(load_pattern_database(path, goal))
+        else:
+            database = build_pattern_database(tiles, goal)
+            if path is not None:
+                database.save(path)
+            databases.append(database)
+    return PatternDatabaseHeuristic(databases)
+
+# Precomputed Distance Table for the 8-Puzzle
+# The 8-puzzle has only 9!/2 = 181,440 states that can reach a given goal, so one
+# breadth-first search from the goal gives the optimal move count of every state. The
+# counts are stored in a byte array indexed by the Lehmer code of the board (its rank
+# among all permutations), and 255 marks unreachable boards.
+
+DISTANCE_MAGIC = b'DST1'
+DISTANCE_HEADER = struct.Struct('<4sH')
+UNREACHABLE = 255
+
+def lehmer_rank(board):
+    # A board is a permutation of 0 .. n-1, so its rank as a placement of n cells is its Lehmer code
+    return rank_positions(board, len(board))
+
+class DistanceTable:
+    def __init__(self, goal, table):
+        self.goal = list(goal)
+        self.table = table  # bytearray, or a memoryview of a mapped file
+
+    def distance(self, board):
+        distance = self.table[lehmer_rank(board)]
+        return None if distance == UNREACHABLE else distance
+
+    def solve(self, board):
+        # Optimal action sequence by greedy descent: some neighbour of every state is one
+        # move closer to the goal, so each step looks up at most four children
+        distance = self.distance(board)
+        if distance is None:
+            return None
+        geometry = board_geometry(len(board))
+        board = list(board)
+        blank = board.index(0)
+        actions = []
+        while distance > 0:
+            for new_blank, action in geometry.moves[blank]:
+                board[blank], board[new_blank] = board[new_blank], 0
+                if self.table[lehmer_rank(board)] == distance - 1:
+                    break
+                board[new_blank], board[blank] = board[blank], 0
+            actions.append(action)
+            blank = new_blank
+            distance -= 1
+        return actions
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(DISTANCE_HEADER.pack(DISTANCE_MAGIC, len(self.goal)))
+            file.write(bytes(self.goal))
+            file.write(self.table)
+
+def build_distance_table(goal):
+    # One breadth-first search from the goal over the whole state space (boards of up to 9 cells)
+    n = len(goal)
+    if n > 9:
+        raise ValueError("A full distance table is only practical for boards of up to 9 cells")
+    geometry = board_geometry(n)
+    table = bytearray([UNREACHABLE]) * math.factorial(n)
+    table[lehmer_rank(goal)] = 0
+    frontier = deque([(list(goal), goal.index(0))])
+    while frontier:
+        board, blank = frontier.popleft()
+        distance = table[lehmer_rank(board)] + 1
+        for new_blank, _ in geometry.moves[blank]:
+            child = board[:]
+            child[blank], child[new_blank] = child[new_blank], 0
+            rank = lehmer_rank(child)
+            if table[rank] == UNREACHABLE:
+                table[rank] = distance
+                frontier.append((child, new_blank))
+    return DistanceTable(goal, table)
+
+def load_distance_table(path):
+    with open(path, 'rb') as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, n = DISTANCE_HEADER.unpack_from(data)
+    if magic != DISTANCE_MAGIC:
+        raise ValueError(f"{path} is not a distance table file")
+    goal = list(data[DISTANCE_HEADER.size:DISTANCE_HEADER.size + n])
+    return DistanceTable(goal, memoryview(data)[DISTANCE_HEADER.size + n:])
+
+# Batch Solving and Benchmarks
+
+# Strategies for batch runs: name -> (search function, heuristic or None)
+STRATEGIES = {
+    'BFS': (bfs, None),
+    'Greedy Best-First (Manhattan Distance)': (greedy_best_first_search, manhattan_distance),
+    'A* (Manhattan Distance)': (a_star_search, manhattan_distance),
+    'A* (Out-of-sequence Score)': (a_star_search, out_of_sequence),
+    'IDA* (Manhattan Distance)': (ida_star_search, manhattan_distance),
+}
+
+batch_strategies = None  # The strategies of this worker process, set by init_batch_worker
+
+def init_batch_worker(strategies):
+    global batch_strategies
+    batch_strategies = strategies
+
+def read_boards(path):
+    # Yields one start board per non-empty line, tiles separated by spaces or commas
+    with open(path) as file:
+        for line in file:
+            tiles = line.replace(',', ' ').split()
+            if tiles:
+                yield [int(tile) for tile in tiles]
+
+def solve_instance(strategies, task):
+    strategy, board, goal = task
+    search, heuristic = strategies[strategy]
+    arguments = (PuzzleState(board), goal) if heuristic is None else (PuzzleState(board), goal, heuristic)
+    stats = {}
+    start_time = time.perf_counter()
+    move_count = search(*arguments, stats=stats, verbose=False)
+    return strategy, move_count, stats, time.perf_counter() - start_time
+
+def run_batch_instance(task):
+    return solve_instance(batch_strategies, task)
+
+def solve_batch(boards, goal, strategies=None, processes=None):
+    # Solves every board (a list, a generator or read_boards(path)) with every strategy, spread
+    # over a process pool, and returns a benchmark report per strategy: instances, solved,
+    # total nodes expanded, largest peak frontier, total wall time and total solution length.
+    # Workers are forked and receive the strategies through the pool initializer, so
+    # strategies may use any heuristic callable; without fork the instances are solved
+    # in this process.
+    if strategies is None:
+        strategies = STRATEGIES
+    tasks = ((strategy, board, goal) for board in boards for strategy in strategies)
+    report = {strategy: {'instances': 0, 'solved': 0, 'nodes_expanded': 0, 'peak_frontier': 0,
+                         'wall_time': 0.0, 'moves': 0} for strategy in strategies}
+
+    if processes == 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        outcomes = (solve_instance(strategies, task) for task in tasks)
+        pool = None
+    else:
+        pool = multiprocessing.get_context('fork').Pool(processes, init_batch_worker, (strategies,))
+        outcomes = pool.imap_unordered(run_batch_instance, tasks, 4)
+    try:
+        for strategy, move_count, stats, wall_time in outcomes:
+            entry = report[strategy]
+            entry['instances'] += 1
+            entry['wall_time'] += wall_time
+            if move_count is not None:
+                entry['solved'] += 1
+                entry['moves'] += move_count
+                entry['nodes_expanded'] += stats.get('nodes_expanded', 0)
+                entry['peak_frontier'] = max(entry['peak_frontier'], stats.get('peak_frontier', 0))
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return report
+
+def print_benchmark_report(report):
+    print(f"{'Strategy':45} {'Solved':>8} {'Avg nodes':>10} {'Max frontier':>13} {'Avg ms':>9} {'Avg moves':>10}")
+    for strategy, entry in report.items():
+        solved = max(entry['solved'], 1)
+        print(f"{strategy:45} {entry['solved']:>4}/{entry['instances']:<3} {entry['nodes_expanded'] / solved:>10.1f} "
+              f"{entry['peak_frontier']:>13} {1000 * entry['wall_time'] / max(entry['instances'], 1):>9.2f} "
+              f"{entry['moves'] / solved:>10.2f}")
 
 # Puzzle State Example
 start_state = PuzzleState([1, 2, 3, 4, 0, 5, 6, 7, 8])
@@ -176,7 +757,52 @@ results['Greedy Best-First (Out-of-sequence Score)'] = greedy_best_first_search(
 print("\nA* Search with Out-of-sequence Score:")
 results['A* (Out-of-sequence Score)'] = a_star_search(start_state, goal_state, out_of_sequence)
 
+# IDA* Search with Manhattan Distance
+print("\nIDA* Search with Manhattan Distance:")
+results['IDA* (Manhattan Distance)'] = ida_star_search(start_state, goal_state, manhattan_distance)
+
+# A* Search with additive pattern databases, built once and loaded from disk afterwards
+print("\nA* Search with Additive Pattern Databases:")
+with tempfile.TemporaryDirectory() as pdb_directory:
+    additive_pattern_heuristic(goal_state, [(1, 2, 3, 4), (5, 6, 7, 8)], pdb_directory)
+    pattern_heuristic = additive_pattern_heuristic(goal_state, [(1, 2, 3, 4), (5, 6, 7, 8)], pdb_directory)
+    results['A* (Pattern Databases)'] = a_star_search(start_state, goal_state, pattern_heuristic)
+    del pattern_heuristic
+
+# IDA* Search with Manhattan Distance on a 15-puzzle
+print("\nIDA* Search with Manhattan Distance on a 15-puzzle:")
+results['IDA* 15-puzzle (Manhattan Distance)'] = ida_star_search(
+    PuzzleState([1, 2, 3, 4, 5, 6, 0, 8, 9, 10, 7, 11, 13, 14, 15, 12]),
+    [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 0], manhattan_distance)
+
+# An unsolvable start state (two tiles swapped) is rejected without searching
+print("\nA* Search from an unsolvable start state:")
+a_star_search(PuzzleState([2, 1, 3, 4, 5, 6, 7, 8, 0]), goal_state, manhattan_distance)
+
+# Optimal moves looked up in a precomputed distance table, built offline and loaded from disk
+print("\nLookup in the Precomputed Distance Table:")
+with tempfile.TemporaryDirectory() as table_directory:
+    table_path = os.path.join(table_directory, "8puzzle_distances.bin")
+    build_distance_table(goal_state).save(table_path)
+    distance_table = load_distance_table(table_path)
+    table_actions = distance_table.solve(start_state.board)
+    print(f"Actions: {table_actions}")
+    print(f"Number of moves: {len(table_actions)}")
+    results['Distance Table'] = len(table_actions)
+    del distance_table
+
 # Summary of the number of moves for each strategy
 print("\nSummary of Number of Moves:")
 for method, moves in results.items():
     print(f"{method}: {moves} moves")
+
+# Benchmark of the strategies over a batch of random solvable start states
+print("\nBenchmark over 20 random start states:")
+rng = random.Random(0)
+def random_boards(count, moves=40):
+    for _ in range(count):
+        state = PuzzleState(goal_state[:])
+        for _ in range(moves):
+            state = rng.choice(state.generate_children())
+        yield state.board
+print_benchmark_report(solve_batch(random_boards(20), goal_state))
@@ -1,3 +1,5 @@
+import math
+from array import array
 from collections import deque
 
 # Define the state of the water jugs
@@ -17,12 +19,11 @@ class WaterJugState:
         return hash(self.jugs)
 
 # Generate all possible next states from the current state
-def next_states(state):
+def next_states(state, jug_sizes=(8, 5, 3)):
     successors = []
-    jug_sizes = (8, 5, 3)  
 
-    for i in range(3):
-        for j in range(3):
+    for i in range(len(jug_sizes)):
+        for j in range(len(jug_sizes)):
             if i != j:
                 new_jugs = list(state.jugs)
                 transfer_amount = min(new_jugs[i], jug_sizes[j] - new_jugs[j])
@@ -38,7 +39,7 @@ def next_states(state):
 def bfs(initial_state, goal_state):
     #Queue as a frontier
     frontier = deque([initial_state])
-    explored = {}
+    seen = {initial_state.jugs}  # Explored and frontier states, for O(1) membership checks
     state_count = 0
 
     while frontier:
@@ -46,10 +47,10 @@ def bfs(initial_state, goal_state):
         state_count += 1
         if current_state.is_goal(goal_state):
             return current_state, state_count
-        explored[current_state.jugs] = current_state
 
         for next_state in next_states(current_state):
-            if next_state.jugs not in explored and all(next_state.jugs != s.jugs for s in frontier):
+            if next_state.jugs not in seen:
+                seen.add(next_state.jugs)
                 frontier.append(next_state)
 
     return None, state_count
@@ -62,6 +63,149 @@ def print_solution(state):
     action_str = state.action if state.action else "None"
     print(f"State: {state.jugs}, Action: {action_str}")
 
+# Generalized solver for any number of jugs and any capacities
+
+# Pouring only moves water, so the total volume never changes and every jug always holds a
+# multiple of the gcd of the capacities and the initial amounts. Goals failing either test
+# are rejected without searching.
+def can_reach(capacities, initial, goal):
+    if len(goal) != len(capacities) or sum(goal) != sum(initial):
+        return False
+    if any(amount < 0 or amount > capacity for amount, capacity in zip(goal, capacities)):
+        return False
+    unit = math.gcd(*capacities, *initial)
+    if unit == 0:
+        # Nothing can hold or contain water, so only the all-empty goal is reachable
+        return not any(goal)
+    return all(amount % unit == 0 for amount in goal)
+
+# Every pour that moves some water: yields (next jugs, from jug, to jug)
+def pours(jugs, capacities):
+    for i, amount in enumerate(jugs):
+        if amount == 0:
+            continue
+        for j, capacity in enumerate(capacities):
+            if i != j and jugs[j] < capacity:
+                transfer_amount = min(amount, capacity - jugs[j])
+                new_jugs = list(jugs)
+                new_jugs[i] -= transfer_amount
+                new_jugs[j] += transfer_amount
+                yield tuple(new_jugs), i, j
+
+# Builds the WaterJugState chain from the parent map, so print_solution works on the result
+def rebuild_solution(parents, jugs):
+    chain = []
+    while jugs is not None:
+        chain.append(jugs)
+        jugs = parents[jugs][0]
+    state = None
+    for jugs in reversed(chain):
+        if state is None:
+            state = WaterJugState(jugs)
+        else:
+            i, j = parents[jugs][1:]
+            transfer_amount = state.jugs[i] - jugs[i]
+            state = WaterJugState(jugs, state, f"Pour {transfer_amount}L from jug {i+1} to jug {j+1}")
+    return state
+
+# BFS over tuples with a single parent map (jugs -> (parent jugs, from jug, to jug)) serving as
+# the seen set, so each reachable state is generated and checked in O(1).
+# Returns (goal state, states explored) like bfs; the goal state is None when unreachable.
+def solve_decantation(capacities, initial, goal):
+    capacities, initial, goal = tuple(capacities), tuple(initial), tuple(goal)
+    if len(initial) != len(capacities) or any(amount < 0 or amount > capacity for amount, capacity in zip(initial, capacities)):
+        raise ValueError(f"Initial state {initial} does not fit the capacities {capacities}")
+    if not can_reach(capacities, initial, goal):
+        return None, 0
+
+    parents = {initial: (None, -1, -1)}
+    frontier = deque([initial])
+    state_count = 0
+
+    while frontier:
+        jugs = frontier.popleft()
+        state_count += 1
+        if jugs == goal:
+            return rebuild_solution(parents, jugs), state_count
+
+        for next_jugs, i, j in pours(jugs, capacities):
+            if next_jugs not in parents:
+                parents[next_jugs] = (jugs, i, j)
+                frontier.append(next_jugs)
+
+    return None, state_count
+
+# Reachability map: one BFS over every state reachable from the initial state
+
+# States are numbered in BFS order; parent[k] is the number of the state that reached state k
+# and move[k] the pour (from jug * number of jugs + to jug), both kept in flat arrays.
+# Since BFS numbers states by depth, the first state holding an amount is a closest one,
+# so both kinds of query just walk parents back: O(solution length).
+class ReachabilityMap:
+    def __init__(self, capacities, initial):
+        self.capacities = tuple(capacities)
+        self.initial = tuple(initial)
+        self.states = [self.initial]
+        self.index = {self.initial: 0}
+        self.parent = array('l', [-1])
+        self.move = array('H', [0])
+        self.first_holding = {}  # amount -> first state in which some jug holds it
+        jug_count = len(self.capacities)
+
+        k = 0
+        while k < len(self.states):
+            jugs = self.states[k]
+            for amount in jugs:
+                self.first_holding.setdefault(amount, k)
+            for next_jugs, i, j in pours(jugs, self.capacities):
+                if next_jugs not in self.index:
+                    self.index[next_jugs] = len(self.states)
+                    self.states.append(next_jugs)
+                    self.parent.append(k)
+                    self.move.append(i * jug_count + j)
+            k += 1
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, jugs):
+        return tuple(jugs) in self.index
+
+    def solution(self, k):
+        # WaterJugState chain from the initial state to state number k
+        chain = []
+        while k >= 0:
+            chain.append(k)
+            k = self.parent[k]
+        state = None
+        jug_count = len(self.capacities)
+        for k in reversed(chain):
+            jugs = self.states[k]
+            if state is None:
+                state = WaterJugState(jugs)
+            else:
+                i, j = divmod(self.move[k], jug_count)
+                transfer_amount = state.jugs[i] - jugs[i]
+                state = WaterJugState(jugs, state, f"Pour {transfer_amount}L from jug {i+1} to jug {j+1}")
+        return state
+
+    def solve(self, goal):
+        k = self.index.get(tuple(goal))
+        return None if k is None else self.solution(k)
+
+    def solve_amount(self, amount):
+        # Shortest solution in which some jug holds the given amount
+        k = self.first_holding.get(amount)
+        return None if k is None else self.solution(k)
+
+reachability_maps = {}  # (capacities, initial) -> ReachabilityMap
+
+def reachability_map(capacities, initial):
+    key = (tuple(capacities), tuple(initial))
+    if key not in reachability_maps:
+        reachability_maps[key] = ReachabilityMap(*key)
+    return reachability_maps[key]
+
 # Get the target state from the user
 goal_state = tuple(map(int, input("Enter the goal state as three integers (e.g., 4 1 3): ").split()))
 
@@ -77,3 +221,19 @@ if goal_state:
     print(f"Total states explored: {explored_states}")
 else:
     print("No solution found")
+
+# Generalized solver on a four-jug instance
+print("\nFour jugs (24, 13, 11, 5) starting at (24, 0, 0, 0), goal (8, 8, 8, 0):")
+solution, explored_states = solve_decantation((24, 13, 11, 5), (24, 0, 0, 0), (8, 8, 8, 0))
+if solution:
+    print_solution(solution)
+    print(f"Total states explored: {explored_states}")
+else:
+    print("No solution found")
+
+# Reachability map for the (8, 5, 3) jugs: every amount from one BFS
+jug_map = reachability_map((8, 5, 3), (8, 0, 0))
+print(f"\nReachable states from (8, 0, 0): {len(jug_map)}")
+for amount in range(1, 9):
+    solution = jug_map.solve_amount(amount)
+    print(f"{amount}L: {solution.jugs if solution else 'unreachable'}")
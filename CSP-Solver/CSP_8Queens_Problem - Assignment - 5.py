@@ -1,5 +1,11 @@
 # Session 5: DFS Solver for CSP — N-Queens Problem
 
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+
 # 1) Class Variable
 class Variable:
     def __init__(self, name, domain):
@@ -31,11 +37,13 @@ class CSP:
         self.name = name
         self.variables = variables
         self.constraints = constraints
-        self.var_to_const = {var: set() for var in variables}
+        # Insertion-ordered dicts used as sets: membership is O(1) and the constraints keep
+        # their order, so runs repeat
+        self.var_to_const = {var: {} for var in variables}
         
         for constraint in constraints:
             for var in constraint.scope:
-                self.var_to_const[var].add(constraint)
+                self.var_to_const[var][constraint] = None
 
     def consistent(self, assignment):
         # Returns True if the assignment is consistent with all constraints.
@@ -43,6 +51,22 @@ class CSP:
             if constraint.can_evaluate(assignment) and not constraint.holds(assignment):
                 return False
         return True
+
+    def consistent_with(self, var, assignment):
+        # Incremental check after assigning var: only the constraints on var can have changed.
+        for constraint in self.var_to_const[var]:
+            if constraint.can_evaluate(assignment) and not constraint.holds(assignment):
+                return False
+        return True
+
+    def constraints_by_depth(self, variable_order):
+        # Entry d lists the constraints whose last variable in variable_order is at position d,
+        # i.e. those that become fully evaluable when the d-th variable is assigned.
+        position = {var: depth for depth, var in enumerate(variable_order)}
+        checks = [[] for _ in variable_order]
+        for constraint in self.constraints:
+            checks[max(position[var] for var in constraint.scope)].append(constraint)
+        return checks
     
 # 4) 8 - Queens
 # Not attacking condition
@@ -77,22 +101,349 @@ csp_8_queens = CSP("8-Queens", variables, constraints)
 def dfs_solver(csp, variable_order=None):
     if variable_order is None:
         variable_order = list(csp.variables)
+    # Assigning in variable_order, only the constraints completed at this depth need checking
+    checks = csp.constraints_by_depth(variable_order)
 
     def backtrack(assignment):
         if len(assignment) == len(csp.variables):
             yield assignment
             return
 
-        var = next(v for v in variable_order if v not in assignment)
+        depth = len(assignment)
+        var = variable_order[depth]
         for value in var.domain:
             local_assignment = assignment.copy()
             local_assignment[var] = value
 
-            if csp.consistent(local_assignment):
+            if all(constraint.holds(local_assignment) for constraint in checks[depth]):
                 yield from backtrack(local_assignment)
 
     return backtrack({})
 
+# 6) Trail-Based Solver
+# One mutable assignment for the whole search: every change is pushed on an undo trail and
+# backtracking pops the trail back to the mark taken when its depth was entered. Per-depth
+# value indices replace the recursion, so a node copies nothing; only solutions are copied.
+#
+# Propagation modes prune the live domains after each assignment (restored from the trail):
+#   None               - plain backtracking, conflicts are found once a constraint is complete
+#   'forward-checking' - constraints left with one unassigned variable prune that variable
+#   'ac3'              - AC-3 arc consistency before the search, and after each forward check
+#                        over constraints left with two unassigned variables
+#
+# Dynamic ordering, chosen per solver:
+#   variable_selection='mrv' - fewest live values first, ties broken by the larger degree in
+#                              var_to_const, then by the variable that has failed most often.
+#                              Candidates wait in a heap with lazy entries: a variable gets a
+#                              new entry whenever its key changes, and outdated entries are
+#                              dropped when they reach the top, so a choice costs O(log n)
+#   value_ordering='lcv'     - values ruling out the fewest live values of neighbours first
+PROPAGATION_MODES = (None, 'forward-checking', 'ac3')
+VARIABLE_SELECTIONS = (None, 'mrv')
+VALUE_ORDERINGS = (None, 'lcv')
+ASSIGNED = object()  # Trail marker for an assignment, other entries are pruned domain values
+
+class TrailSolver:
+    def __init__(self, csp, variable_order=None, propagation=None, variable_selection=None, value_ordering=None):
+        assert propagation in PROPAGATION_MODES, (f"Unknown propagation mode: {propagation}")
+        assert variable_selection in VARIABLE_SELECTIONS, (f"Unknown variable selection: {variable_selection}")
+        assert value_ordering in VALUE_ORDERINGS, (f"Unknown value ordering: {value_ordering}")
+        self.csp = csp
+        self.variable_order = list(csp.variables) if variable_order is None else list(variable_order)
+        self.checks = csp.constraints_by_depth(self.variable_order)
+        self.propagation = propagation
+        self.variable_selection = variable_selection
+        self.value_ordering = value_ordering
+        self.degree = {var: len(constraints) for var, constraints in csp.var_to_const.items()}
+        self.conflicts = {var: 0 for var in csp.variables}  # Failed assignments per variable
+        self.position = {var: i for i, var in enumerate(self.variable_order)}  # Final tie-break
+        self.candidates = None  # MRV heap of (live values, -degree, -conflicts, position, var)
+        self.assignment = {}
+        self.domains = {var: set(var.domain) for var in csp.variables}  # Live values
+        self.trail = []
+        self.nodes = 0
+        self.pruned = {'forward-checking': 0, 'ac3': 0}  # Domain values pruned by each technique
+
+    def assign(self, var, value):
+        self.assignment[var] = value
+        self.trail.append((var, ASSIGNED))
+
+    def prune(self, var, value, technique):
+        self.domains[var].discard(value)
+        self.trail.append((var, value))
+        self.pruned[technique] += 1
+        if self.candidates is not None:
+            self.requeue(var)
+
+    def undo(self, mark):
+        while len(self.trail) > mark:
+            var, value = self.trail.pop()
+            if value is ASSIGNED:
+                del self.assignment[var]
+            else:
+                self.domains[var].add(value)
+            if self.candidates is not None:
+                self.requeue(var)
+
+    def candidate(self, var):
+        return (len(self.domains[var]), -self.degree[var], -self.conflicts[var], self.position[var], var)
+
+    def requeue(self, var):
+        # Entry for the variable's current key; its older entries become outdated. Pruning
+        # checks assign values temporarily, so assigned variables are filtered on selection.
+        heapq.heappush(self.candidates, self.candidate(var))
+
+    def unassigned(self, constraint):
+        return [var for var in constraint.scope if var not in self.assignment]
+
+    def forward_check(self, var):
+        # Prunes the values of the last unassigned variable of each constraint on var;
+        # returns the pruned variables, or None when a domain runs empty
+        assignment = self.assignment
+        changed = []
+        for constraint in self.csp.var_to_const[var]:
+            free = self.unassigned(constraint)
+            if len(free) != 1:
+                continue
+            other = free[0]
+            for value in [value for value in other.domain if value in self.domains[other]]:
+                assignment[other] = value
+                if not constraint.holds(assignment):
+                    self.prune(other, value, 'forward-checking')
+            assignment.pop(other, None)
+            if not self.domains[other]:
+                return None
+            changed.append(other)
+        return changed
+
+    def revise(self, var, constraint, other):
+        # Prunes the values of var without a support in other's domain under constraint
+        assignment = self.assignment
+        revised = False
+        for value in [value for value in var.domain if value in self.domains[var]]:
+            assignment[var] = value
+            for support in self.domains[other]:
+                assignment[other] = support
+                if constraint.holds(assignment):
+                    break
+            else:
+                self.prune(var, value, 'ac3')
+                revised = True
+            assignment.pop(other, None)
+        assignment.pop(var, None)
+        return revised
+
+    def arcs_into(self, var):
+        # Arcs (z, constraint, var) over the constraints on var with two unassigned variables
+        for constraint in self.csp.var_to_const[var]:
+            free = self.unassigned(constraint)
+            if len(free) == 2 and var in free:
+                yield free[0] if free[1] is var else free[1], constraint, var
+
+    def ac3(self, arcs):
+        queue = deque(arcs)
+        while queue:
+            var, constraint, other = queue.popleft()
+            if var in self.assignment or other in self.assignment:
+                continue
+            if not self.domains[var] or not self.domains[other]:
+                return False
+            if self.revise(var, constraint, other):
+                if not self.domains[var]:
+                    return False
+                queue.extend(arc for arc in self.arcs_into(var) if arc[1] is not constraint)
+        return True
+
+    def propagate(self, var):
+        if self.propagation is None:
+            return True
+        changed = self.forward_check(var)
+        if changed is None:
+            return False
+        if self.propagation == 'ac3':
+            arcs = []
+            for constraint in self.csp.var_to_const[var]:
+                free = self.unassigned(constraint)
+                if len(free) == 2:
+                    arcs += [(free[0], constraint, free[1]), (free[1], constraint, free[0])]
+            for other in changed:
+                arcs.extend(self.arcs_into(other))
+            return self.ac3(arcs)
+        return True
+
+    def consistent(self, var, depth):
+        if self.variable_selection is not None:
+            # The order is dynamic, so the constraints completed at each depth are not known
+            return self.csp.consistent_with(var, self.assignment)
+        for constraint in self.checks[depth]:
+            if not constraint.holds(self.assignment):
+                return False
+        return True
+
+    def select_variable(self):
+        # Minimum remaining values, then largest degree, then most conflicts. The top entry
+        # is only read, not removed: it goes out of date once its variable is assigned.
+        candidates = self.candidates
+        if len(candidates) > 4 * len(self.position) + 64:
+            # Mostly outdated entries: rebuild from the unassigned variables
+            candidates[:] = [self.candidate(var) for var in self.variable_order if var not in self.assignment]
+            heapq.heapify(candidates)
+        while True:
+            size, _, conflicts, _, var = candidates[0]
+            if var not in self.assignment and size == len(self.domains[var]) and -conflicts == self.conflicts[var]:
+                return var
+            heapq.heappop(candidates)
+
+    def order_values(self, var):
+        # Least constraining value: sorts the live values by how many live values of the
+        # neighbours (variables sharing a constraint that only lacks those two) each rules out
+        assignment = self.assignment
+        neighbours = []
+        for constraint in self.csp.var_to_const[var]:
+            free = self.unassigned(constraint)
+            if len(free) == 2:
+                neighbours.append((constraint, free[0] if free[1] is var else free[1]))
+        ruled_out = {}
+        for value in var.domain:
+            if value not in self.domains[var]:
+                continue
+            assignment[var] = value
+            count = 0
+            for constraint, other in neighbours:
+                for support in self.domains[other]:
+                    assignment[other] = support
+                    if not constraint.holds(assignment):
+                        count += 1
+                assignment.pop(other, None)
+            ruled_out[value] = count
+        assignment.pop(var, None)
+        return sorted(ruled_out, key=ruled_out.get)
+
+    def select(self, depth, order, values):
+        # Fixes the variable and the value order of a newly entered depth
+        if self.variable_selection == 'mrv':
+            order[depth] = self.select_variable()
+        var = order[depth]
+        values[depth] = self.order_values(var) if self.value_ordering == 'lcv' else var.domain
+
+    def solutions(self):
+        order = list(self.variable_order)  # Variable of each depth, chosen on entry when dynamic
+        last = len(order) - 1
+        if last < 0:
+            yield {}
+            return
+        self.assignment = {}
+        self.domains = {var: set(var.domain) for var in self.csp.variables}
+        self.trail = []
+        if self.propagation == 'ac3':
+            arcs = []
+            for constraint in self.csp.constraints:
+                if len(constraint.scope) == 2:
+                    first, second = constraint.scope
+                    arcs += [(first, constraint, second), (second, constraint, first)]
+            if not self.ac3(arcs):
+                return
+        if self.variable_selection == 'mrv':
+            self.candidates = [self.candidate(var) for var in order]
+            heapq.heapify(self.candidates)
+        choice = [0] * len(order)  # Index of the next value to try at each depth
+        marks = [0] * len(order)  # Trail length when each depth was entered
+        values = [None] * len(order)  # Value order of each depth
+        marks[0] = len(self.trail)
+        depth = 0
+        self.select(depth, order, values)
+
+        while depth >= 0:
+            var = order[depth]
+            self.undo(marks[depth])
+            domain, live = values[depth], self.domains[var]
+            while choice[depth] < len(domain) and domain[choice[depth]] not in live:
+                choice[depth] += 1
+            if choice[depth] == len(domain):
+                depth -= 1
+                continue
+            value = domain[choice[depth]]
+            choice[depth] += 1
+            self.nodes += 1
+            self.assign(var, value)
+
+            if not self.consistent(var, depth) or not self.propagate(var):
+                self.conflicts[var] += 1
+                continue
+            if depth == last:
+                yield dict(self.assignment)
+                continue
+            depth += 1
+            choice[depth] = 0
+            marks[depth] = len(self.trail)
+            self.select(depth, order, values)
+
+def trail_solver(csp, variable_order=None, propagation=None, variable_selection=None, value_ordering=None):
+    return TrailSolver(csp, variable_order, propagation, variable_selection, value_ordering).solutions()
+
+# 7) Compiled Constraints
+# Extensional forms of constraints over small finite domains, so that a check is a table
+# lookup instead of a call through the condition. A binary constraint becomes one support
+# bitset per value of its first variable (bit j set when the j-th value of the second
+# variable is allowed); a small n-ary constraint becomes a flat boolean table indexed by the
+# mixed-radix number of its value positions. A value outside the compiled domains falls
+# back to the condition.
+class BitsetConstraint(Constraint):
+    def __init__(self, constraint):
+        super().__init__(constraint.scope, constraint.condition, constraint.name)
+        first, second = self.scope
+        self.first, self.second = first, second
+        self.first_position = {value: i for i, value in enumerate(first.domain)}
+        self.second_position = {value: j for j, value in enumerate(second.domain)}
+        self.supports = [sum(1 << j for j, b in enumerate(second.domain) if constraint.condition(a, b))
+                         for a in first.domain]
+
+    def holds(self, assignment):
+        try:
+            i = self.first_position[assignment[self.first]]
+            j = self.second_position[assignment[self.second]]
+        except KeyError:
+            return super().holds(assignment)
+        return (self.supports[i] >> j) & 1 == 1
+
+class TableConstraint(Constraint):
+    def __init__(self, constraint):
+        super().__init__(constraint.scope, constraint.condition, constraint.name)
+        self.positions = [{value: i for i, value in enumerate(var.domain)} for var in self.scope]
+        self.table = bytearray(bool(self.condition(*values))
+                               for values in itertools.product(*(var.domain for var in self.scope)))
+
+    def holds(self, assignment):
+        index = 0
+        try:
+            for var, position in zip(self.scope, self.positions):
+                index = index * len(position) + position[assignment[var]]
+        except KeyError:
+            return super().holds(assignment)
+        return self.table[index] == 1
+
+def compile_constraint(constraint, max_table_size=1 << 16):
+    # Returns the extensional form of the constraint, or the constraint itself when its
+    # domains are too large to tabulate, contain repeated or unhashable values, or it is
+    # already compiled
+    if isinstance(constraint, (BitsetConstraint, TableConstraint)):
+        return constraint
+    domains = [var.domain for var in constraint.scope]
+    try:
+        if any(len(set(domain)) != len(domain) for domain in domains):
+            return constraint
+    except TypeError:
+        return constraint
+    if math.prod(len(domain) for domain in domains) > max_table_size:
+        return constraint
+    if len(constraint.scope) == 2 and constraint.scope[0] is not constraint.scope[1]:
+        return BitsetConstraint(constraint)
+    return TableConstraint(constraint)
+
+def compile_csp(csp, max_table_size=1 << 16):
+    # Same variables, with every constraint that fits the size limit compiled
+    return CSP(csp.name, csp.variables, [compile_constraint(constraint, max_table_size) for constraint in csp.constraints])
+
 # Printing the solution
 def print_8_queens_solution(solution):
     board = [['.'] * 8 for _ in range(8)]  
@@ -117,3 +468,37 @@ for idx, solution in enumerate(solutions, 1):
     else:
         print("Invalid Command")
 
+# Trail-based solver: same solutions in the same order as the DFS solver, for each propagation mode
+dfs_solutions = list(dfs_solver(csp_8_queens))
+for propagation in PROPAGATION_MODES:
+    solver = TrailSolver(csp_8_queens, propagation=propagation)
+    trail_solutions = list(solver.solutions())
+    print(f"Trail solver ({propagation}): {len(trail_solutions)} solutions, {solver.nodes} nodes, "
+          f"pruned {solver.pruned}, same as DFS: {trail_solutions == dfs_solutions}")
+
+# Dynamic ordering finds the same solutions in another order
+def rows(solution):
+    return tuple(solution[var] for var in variables)
+
+for variable_selection, value_ordering in (('mrv', None), (None, 'lcv'), ('mrv', 'lcv')):
+    solver = TrailSolver(csp_8_queens, propagation='forward-checking',
+                         variable_selection=variable_selection, value_ordering=value_ordering)
+    search = solver.solutions()
+    first = next(search)
+    first_nodes = solver.nodes
+    trail_solutions = [first] + list(search)
+    print(f"Forward checking with {variable_selection} / {value_ordering}: first solution after {first_nodes} nodes, "
+          f"{len(trail_solutions)} solutions, same set as DFS: "
+          f"{sorted(map(rows, trail_solutions)) == sorted(map(rows, dfs_solutions))}")
+
+# Compiled constraints: the 28 diagonal constraints become bitsets, the 8-variable
+# different_rows (8^8 tuples) keeps its condition
+compiled_8_queens = compile_csp(csp_8_queens)
+print(f"Compiled constraints: {sum(isinstance(c, BitsetConstraint) for c in compiled_8_queens.constraints)} bitsets, "
+      f"{sum(isinstance(c, TableConstraint) for c in compiled_8_queens.constraints)} tables, "
+      f"{sum(type(c) is Constraint for c in compiled_8_queens.constraints)} conditions")
+for name, csp in (("conditions", csp_8_queens), ("compiled", compiled_8_queens)):
+    start_time = time.perf_counter()
+    trail_solutions = list(dfs_solver(csp))
+    print(f"DFS solver with {name}: {len(trail_solutions)} solutions in {time.perf_counter() - start_time:.3f}s, "
+          f"same as DFS: {list(map(rows, trail_solutions)) == list(map(rows, dfs_solutions))}")
@@ -3,6 +3,7 @@
 # 1) Representing Search Problems
 
 from abc import ABC, abstractmethod
+from array import array
 
 class Search_problem(ABC):
     @abstractmethod
@@ -31,16 +32,100 @@ class Edge:
     def __repr__(self):
         return f"Edge({self.from_node} -> {self.to_node}, cost={self.cost}, action={self.action})"
 
-# 2)  Explicit Representation of Search Graph
+# 2) Explicit Representation of Search Graph
+
+class AdjacencyIndex:
+    # Compact adjacency index in CSR layout. Every node is interned to an integer id,
+    # and the out-edges of node i occupy slots offsets[i] .. offsets[i+1]-1 of the
+    # targets/costs arrays. edge_ids maps each slot back to its position in the Edge list.
+    def __init__(self, node_names, offsets, targets, costs, edges=None, edge_ids=None):
+        self.node_names = node_names
+        self.node_ids = {name: i for i, name in enumerate(node_names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.edges = edges
+        self.edge_ids = edge_ids
+        self.adjacency = [None] * len(node_names)  # Per-node tuples of Edge objects, built on first use
+
+    def num_nodes(self):
+        return len(self.node_names)
+
+    def num_edges(self):
+        return len(self.targets)
+
+    def node_id(self, node):
+        return self.node_ids.get(node)
+
+    def node_name(self, i):
+        return self.node_names[i]
+
+    def edge(self, i, slot):
+        # The Edge stored in a CSR slot whose source is node i
+        if self.edges is not None:
+            return self.edges[self.edge_ids[slot]]
+        return Edge(self.node_names[i], self.node_names[self.targets[slot]], self.costs[slot])
+
+    def neighbors(self, i):
+        edges = self.adjacency[i]
+        if edges is None:
+            edges = tuple(self.edge(i, slot) for slot in range(self.offsets[i], self.offsets[i + 1]))
+            self.adjacency[i] = edges
+        return edges
+
+def index_from_edges(edges, nodes=()):
+    # Builds an AdjacencyIndex with a counting sort on the source node, so every
+    # node keeps its edges in the same order as the original edge list.
+    node_ids = {}
+    node_names = []
+    for edge in edges:
+        for node in (edge.from_node, edge.to_node):
+            if node not in node_ids:
+                node_ids[node] = len(node_names)
+                node_names.append(node)
+    for node in nodes:
+        if node not in node_ids:
+            node_ids[node] = len(node_names)
+            node_names.append(node)
+
+    num_nodes, num_edges = len(node_names), len(edges)
+    offsets = array('q', bytes(8 * (num_nodes + 1)))
+    for edge in edges:
+        offsets[node_ids[edge.from_node] + 1] += 1
+    for i in range(num_nodes):
+        offsets[i + 1] += offsets[i]
+
+    next_slot = array('q', offsets)
+    targets = array('q', bytes(8 * num_edges))
+    costs = array('d', bytes(8 * num_edges))
+    edge_ids = array('q', bytes(8 * num_edges))
+    for k, edge in enumerate(edges):
+        i = node_ids[edge.from_node]
+        slot = next_slot[i]
+        next_slot[i] += 1
+        targets[slot] = node_ids[edge.to_node]
+        costs[slot] = edge.cost
+        edge_ids[slot] = k
+
+    return AdjacencyIndex(node_names, offsets, targets, costs, edges, edge_ids)
 
 class Search_problem_from_explicit_graph(Search_problem):
     def __init__(self, title, nodes, edges, start, goals, heuristic=None):
         self.title = title
         self.nodes = nodes
-        self.edges = edges
         self.start = start
         self.goals = goals
         self.heuristic_dict = heuristic if heuristic else {}
+        self.set_edges(edges)
+
+    @property
+    def edges(self):
+        # A tuple, so the edges cannot change behind the index; use set_edges instead
+        return self._edges
+
+    def set_edges(self, edges):
+        self._edges = tuple(edges)
+        self.index = index_from_edges(self._edges, [self.start, *self.goals, *self.nodes])
 
     def start_node(self):
         return self.start
@@ -49,13 +134,16 @@ class Search_problem_from_explicit_graph(Search_problem):
         return node in self.goals
 
     def neighbors(self, node):
-        return [edge for edge in self.edges if edge.from_node == node]
+        i = self.index.node_id(node)
+        if i is None:
+            return ()
+        return self.index.neighbors(i)
 
     def heuristic(self, node):
         return self.heuristic_dict.get(node, 0)
 
     def __repr__(self):
-        return f"SearchProblemFromExplicitGraph('{self.title}', {self.nodes}, {self.edges}, start='{self.start}', goals={self.goals}, heuristic={self.heuristic_dict})"
+        return f"SearchProblemFromExplicitGraph('{self.title}', {self.nodes}, {list(self.edges)}, start='{self.start}', goals={self.goals}, heuristic={self.heuristic_dict})"
 
 # 3) Paths
 
@@ -72,6 +160,13 @@ class Path:
             path_str = f"{self.previous_path} -> {self.node}"
         return f"{path_str} (Total cost: {self.total_cost})"
 
+    def nodes(self):
+        # Nodes on the path, from the last node back to the start
+        path = self
+        while path is not None:
+            yield path.node
+            path = path.previous_path
+
 # 4) Example Search Problems
 
 problem1 = Search_problem_from_explicit_graph('Problem 1',
@@ -99,27 +194,141 @@ problem3 = Search_problem_from_explicit_graph('Problem 3',
     goals={'G'}
 )
 
+problem4 = Search_problem_from_explicit_graph('Problem 4 (cyclic)',
+    {'A', 'B', 'C', 'D', 'G'},
+    [Edge('A', 'B', 1), Edge('B', 'A', 1), Edge('B', 'C', 2), Edge('C', 'A', 1),
+     Edge('A', 'D', 4), Edge('C', 'D', 1), Edge('D', 'B', 1), Edge('D', 'G', 2)],
+    start='A',
+    goals={'G'}
+)
+
 # 5) Searcher
 
+# Pruning modes for the Searcher:
+#   None            - no pruning, every path is enumerated (loops forever on cyclic graphs)
+#   'cycle'         - a path is never extended to a node it already contains
+#   'multiple-path' - every node is expanded at most once, through the first path that reaches it
+PRUNING_MODES = (None, 'cycle', 'multiple-path')
+
 class Searcher:
-    def __init__(self, problem):
+    def __init__(self, problem, pruning=None):
+        assert pruning in PRUNING_MODES, (f"Unknown pruning mode: {pruning}")
         self.problem = problem
+        self.pruning = pruning
         self.frontier = [Path(problem.start_node())]
+        self.explored = set()
+        self.num_expanded = 0
+        self.num_pruned = 0  # Paths discarded by pruning, i.e. expansions saved
 
     def search(self):
         while self.frontier:
             path = self.frontier.pop()  
             node = path.node
 
+            if self.pruning == 'multiple-path':
+                if node in self.explored:
+                    self.num_pruned += 1
+                    continue
+                self.explored.add(node)
+
             if self.problem.is_goal(node):
                 return path
 
+            self.num_expanded += 1
             for edge in self.problem.neighbors(node):
+                if self.pruning == 'cycle' and edge.to_node in path.nodes():
+                    self.num_pruned += 1
+                    continue
                 new_path = Path(edge.to_node, edge, path)
                 self.frontier.append(new_path)
 
         return None
 
+# 6) Depth-Bounded and Iterative-Deepening Search
+
+class DepthBoundedSearcher:
+    # Depth-first search that never extends a path beyond `bound` edges. It keeps only
+    # the edges of the current path and one neighbour iterator per level, so memory is
+    # O(bound) instead of one Path per frontier entry. Nodes already on the current
+    # path are skipped, which never removes a shortest solution.
+    def __init__(self, problem, bound):
+        self.problem = problem
+        self.bound = bound
+        self.num_expanded = 0
+        self.cut_off = False  # True if some path was stopped at the bound
+
+    def search(self):
+        start = self.problem.start_node()
+        if self.problem.is_goal(start):
+            return Path(start)
+
+        edges = []
+        on_path = {start}
+        stack = []
+        if self.bound > 0:
+            self.num_expanded += 1
+            stack.append(iter(self.problem.neighbors(start)))
+        elif self.problem.neighbors(start):
+            self.cut_off = True
+
+        while stack:
+            edge = next(stack[-1], None)
+            if edge is None:
+                stack.pop()
+                if edges:
+                    on_path.discard(edges.pop().to_node)
+                continue
+
+            node = edge.to_node
+            if node in on_path:
+                continue
+            edges.append(edge)
+            on_path.add(node)
+
+            if self.problem.is_goal(node):
+                return self.make_path(start, edges)
+
+            if len(edges) < self.bound:
+                self.num_expanded += 1
+                stack.append(iter(self.problem.neighbors(node)))
+            else:
+                if self.problem.neighbors(node):
+                    self.cut_off = True
+                edges.pop()
+                on_path.discard(node)
+
+        return None
+
+    def make_path(self, start, edges):
+        path = Path(start)
+        for edge in edges:
+            path = Path(edge.to_node, edge, path)
+        return path
+
+class IterativeDeepeningSearcher:
+    # Runs depth-bounded searches with bounds 0, 1, 2, ... so the first solution found
+    # has the fewest edges. Stops when a search was never cut off by its bound (the
+    # whole reachable graph has been searched) or when max_depth is exceeded.
+    def __init__(self, problem, max_depth=None):
+        self.problem = problem
+        self.max_depth = max_depth
+        self.num_expanded = 0
+        self.depth = None  # Bound at which the solution was found
+
+    def search(self):
+        bound = 0
+        while self.max_depth is None or bound <= self.max_depth:
+            searcher = DepthBoundedSearcher(self.problem, bound)
+            path = searcher.search()
+            self.num_expanded += searcher.num_expanded
+            if path is not None:
+                self.depth = bound
+                return path
+            if not searcher.cut_off:
+                return None
+            bound += 1
+        return None
+
 # Depth-first search for problem1
 print("Paths for problem1 using DFS")
 searcher1 = Searcher(problem1)
@@ -143,3 +352,27 @@ result = searcher3.search()
 while result is not None:
     print(result)
     result = searcher3.search()
+
+# Depth-first search with pruning for the cyclic problem4 (without pruning it never terminates)
+for pruning in ('cycle', 'multiple-path'):
+    print(f"\nPaths for problem4 using DFS with {pruning} pruning")
+    searcher4 = Searcher(problem4, pruning)
+    result = searcher4.search()
+    while result is not None:
+        print(result)
+        result = searcher4.search()
+    print(f"Expanded: {searcher4.num_expanded}, pruned (expansions saved): {searcher4.num_pruned}")
+
+# Expansions needed to enumerate every path of problem3 in each pruning mode
+print("\nExpansions for problem3 by pruning mode")
+for pruning in PRUNING_MODES:
+    searcher = Searcher(problem3, pruning)
+    while searcher.search() is not None:
+        pass
+    print(f"{pruning}: expanded {searcher.num_expanded}, pruned {searcher.num_pruned}")
+
+# Iterative-deepening search returns a solution with the fewest edges
+print("\nShallowest paths using iterative-deepening DFS")
+for problem in (problem1, problem2, problem3, problem4):
+    searcher = IterativeDeepeningSearcher(problem)
+    print(f"{problem.title}: {searcher.search()} [depth {searcher.depth}, expanded {searcher.num_expanded}]")
@@ -3,7 +3,20 @@
 # 1) Representing search problems
 
 from abc import ABC, abstractmethod
+import copy
 import heapq
+import itertools
+import math
+from array import array
+from collections import OrderedDict
+import csv
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import tempfile
 
 class Search_problem(ABC):
     @abstractmethod
@@ -34,14 +47,155 @@ class Edge:
     
 # 2) Explicit Representation of Search Graph
 
+class AdjacencyIndex:
+    # Compact adjacency index in CSR layout. Every node is interned to an integer id,
+    # and the out-edges of node i occupy slots offsets[i] .. offsets[i+1]-1 of the
+    # targets/costs arrays. edge_ids maps each slot back to its position in the Edge list.
+    def __init__(self, node_names, offsets, targets, costs, edges=None, edge_ids=None):
+        self.node_names = node_names
+        self.node_ids = {name: i for i, name in enumerate(node_names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.edges = edges
+        self.edge_ids = edge_ids
+        self.adjacency = {}  # Per-node tuples of Edge objects, built on first use
+        self.reverse = None  # Reverse CSR arrays, built on first use
+
+    def num_nodes(self):
+        return len(self.node_names)
+
+    def num_edges(self):
+        return len(self.targets)
+
+    def node_id(self, node):
+        return self.node_ids.get(node)
+
+    def node_name(self, i):
+        return self.node_names[i]
+
+    def edge(self, i, slot):
+        # The Edge stored in a CSR slot whose source is node i
+        if self.edges is not None:
+            return self.edges[self.edge_ids[slot]]
+        return Edge(self.node_name(i), self.node_name(self.targets[slot]), self.costs[slot])
+
+    def neighbors(self, i):
+        edges = self.adjacency.get(i)
+        if edges is None:
+            edges = tuple(self.edge(i, slot) for slot in range(self.offsets[i], self.offsets[i + 1]))
+            self.adjacency[i] = edges
+        return edges
+
+    def reversed(self):
+        # (offsets, targets, costs, forward_slots) of the reversed graph, see reverse_csr
+        if self.reverse is None:
+            self.reverse = reverse_csr(self)
+        return self.reverse
+
+def build_csr(num_nodes, sources, targets, costs):
+    # Counting sort of the edges on their source node. Returns the offsets, targets
+    # and costs arrays in CSR order, plus the original position of every slot.
+    # The sort is stable, so each node keeps its edges in input order.
+    num_edges = len(sources)
+    offsets = array('q', bytes(8 * (num_nodes + 1)))
+    for i in sources:
+        offsets[i + 1] += 1
+    for i in range(num_nodes):
+        offsets[i + 1] += offsets[i]
+
+    next_slot = array('q', offsets)
+    csr_targets = array('q', bytes(8 * num_edges))
+    csr_costs = array('d', bytes(8 * num_edges))
+    edge_ids = array('q', bytes(8 * num_edges))
+    for k in range(num_edges):
+        i = sources[k]
+        slot = next_slot[i]
+        next_slot[i] += 1
+        csr_targets[slot] = targets[k]
+        csr_costs[slot] = costs[k]
+        edge_ids[slot] = k
+
+    return offsets, csr_targets, csr_costs, edge_ids
+
+def reverse_csr(index):
+    # CSR arrays of the reversed graph. Slot k of node v holds an edge u -> v of the
+    # original graph as target u with the same cost, and forward_slots[k] is the
+    # slot of that edge in the forward index.
+    sources = array('q', bytes(8 * index.num_edges()))
+    for i in range(index.num_nodes()):
+        for slot in range(index.offsets[i], index.offsets[i + 1]):
+            sources[slot] = i
+    return build_csr(index.num_nodes(), index.targets, sources, index.costs)
+
+graph_versions = itertools.count()
+
+def goal_set(goals):
+    # A set of goals as given, or a single goal node; a string or tuple is one node name
+    # (a list is taken as several goals, since list nodes cannot be hashed)
+    if isinstance(goals, (set, frozenset)):
+        return goals
+    if isinstance(goals, list):
+        return set(goals)
+    return {goals}
+
+def index_from_edges(edges, nodes=()):
+    node_ids = {}
+    node_names = []
+    for edge in edges:
+        for node in (edge.from_node, edge.to_node):
+            if node not in node_ids:
+                node_ids[node] = len(node_names)
+                node_names.append(node)
+    for node in nodes:
+        if node not in node_ids:
+            node_ids[node] = len(node_names)
+            node_names.append(node)
+
+    sources = array('q', (node_ids[edge.from_node] for edge in edges))
+    targets = array('q', (node_ids[edge.to_node] for edge in edges))
+    costs = array('d', (edge.cost for edge in edges))
+    offsets, targets, costs, edge_ids = build_csr(len(node_names), sources, targets, costs)
+    return AdjacencyIndex(node_names, offsets, targets, costs, edges, edge_ids)
+
 class Search_problem_from_explicit_graph(Search_problem):
-    def __init__(self, title, nodes, edges, start, goals, heuristic=None):
+    def __init__(self, title, nodes, edges, start, goals, heuristic=None, index=None):
         self.title = title
         self.nodes = nodes
-        self.edges = edges
+        self._edges = tuple(edges) if edges is not None else None
         self.start = start
         self.goals = goals
         self.heuristic_dict = heuristic if heuristic else {}
+        self.index = index if index is not None else index_from_edges(self._edges, [start, *goals, *nodes])
+        self.version = next(graph_versions)  # Changes whenever the edges change
+
+    @property
+    def edges(self):
+        # A tuple, so the edges cannot change behind the index and the caches
+        return self._edges
+
+    def add_edges(self, edges):
+        self.check_editable()
+        self.set_edges(self.edges + tuple(edges))
+
+    def set_edges(self, edges):
+        # Edge changes have to go through here, so the index is rebuilt and results
+        # cached for the old version of the graph are no longer used
+        self.check_editable()
+        self._edges = tuple(edges)
+        self.index = index_from_edges(self._edges, [self.start, *self.goals, *(self.nodes or ())])
+        self.version = next(graph_versions)
+
+    def check_editable(self):
+        if self.edges is None:
+            raise ValueError(f"{self.title} is backed by a loaded index and has no Edge list to change")
+
+    def with_query(self, start, goals):
+        # A copy of the problem with another start and goals that shares the graph and its index
+        query = copy.copy(self)
+        query.start = start
+        query.goals = goal_set(goals)
+        return query
 
     def start_node(self):
         return self.start
@@ -50,13 +204,16 @@ class Search_problem_from_explicit_graph(Search_problem):
         return node in self.goals
 
     def neighbors(self, node):
-        return [edge for edge in self.edges if edge.from_node == node]
+        i = self.index.node_id(node)
+        if i is None:
+            return ()
+        return self.index.neighbors(i)
 
     def heuristic(self, node):
         return self.heuristic_dict.get(node, 0)
 
     def __repr__(self):
-        return f"SearchProblemFromExplicitGraph('{self.title}', {self.nodes}, {self.edges}, start='{self.start}', goals={self.goals}, heuristic={self.heuristic_dict})"
+        return f"SearchProblemFromExplicitGraph('{self.title}', {self.nodes}, {list(self.edges) if self.edges is not None else None}, start='{self.start}', goals={self.goals}, heuristic={self.heuristic_dict})"
 
 # 3) Paths
 
@@ -67,20 +224,80 @@ class Path:
         self.previous_path = previous_path
         self.total_cost = edge.cost + previous_path.total_cost if edge and previous_path else 0
 
+    def nodes(self):
+        # Nodes from the start of the path to its end, collected without recursion
+        nodes = []
+        path = self
+        while path is not None:
+            nodes.append(path.node)
+            path = path.previous_path
+        nodes.reverse()
+        return nodes
+
     def __repr__(self):
-        if self.previous_path is None:
-            return f"{self.node}"
-        else:
-            return f"{self.previous_path} -> {self.node}"
+        return " -> ".join(str(node) for node in self.nodes())
 
     def get_full_path(self):
-        if self.previous_path is None:
-            return self.node
-        else:
-            return self.previous_path.get_full_path() + " -> " + self.node
+        return " -> ".join(str(node) for node in self.nodes())
 
     def get_total_cost(self):
         return self.total_cost
+
+class PathStore:
+    # Search paths stored as parallel arrays instead of linked Path objects. Handle h is
+    # the path that ends at node id nodes[h], extending path parents[h] through CSR
+    # slot slots[h], with cumulative cost costs[h]. Root paths have parent -1.
+    # Without an index (any other Search_problem) nodes[h] is the node itself and
+    # edges[h] the Edge that reached it, in place of the slot.
+    def __init__(self, index=None):
+        self.index = index
+        self.parents = array('q')
+        self.nodes = array('q') if index is not None else []
+        self.slots = array('q')
+        self.edges = []
+        self.costs = array('d')
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def add(self, parent, node, slot=-1, cost=0, edge=None):
+        self.parents.append(parent)
+        self.nodes.append(node)
+        if self.index is not None:
+            self.slots.append(slot)
+        else:
+            self.edges.append(edge)
+        self.costs.append(cost)
+        return len(self.nodes) - 1
+
+    def replace(self, handle, parent, slot=-1, cost=0, edge=None):
+        # Reroutes a frontier path (one with no extensions yet) through a cheaper parent
+        self.parents[handle] = parent
+        if self.index is not None:
+            self.slots[handle] = slot
+        else:
+            self.edges[handle] = edge
+        self.costs[handle] = cost
+
+    def to_path(self, handle):
+        # Rebuilds the Path for a handle iteratively, from the root forwards
+        chain = []
+        while handle != -1:
+            chain.append(handle)
+            handle = self.parents[handle]
+        root = chain.pop()
+        if self.index is None:
+            path = Path(self.nodes[root])
+            for handle in reversed(chain):
+                path = Path(self.nodes[handle], self.edges[handle], path)
+            return path
+        path = Path(self.index.node_name(self.nodes[root]))
+        previous = root
+        for handle in reversed(chain):
+            edge = self.index.edge(self.nodes[previous], self.slots[handle])
+            path = Path(edge.to_node, edge, path)
+            previous = handle
+        return path
     
 # 4) Example Search Problems
 
@@ -112,45 +329,729 @@ problem3 = Search_problem_from_explicit_graph('Problem 3',
 # 5) Frontier as a Priority Queue
 
 class FrontierPQ:
+    # Lazy-deletion heap: every add is a new entry, so a node reached several times
+    # stays in the heap several times and the searcher discards the stale copies.
     def __init__(self):
         self.elements = []
         self.counter = 0  
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0  # Counted by the searcher, which knows what has been explored
 
-    def add(self, path):
-        heapq.heappush(self.elements, (path.total_cost, self.counter, path))
+    def add(self, item, priority=None, key=None):
+        # Items are Paths prioritised by their cost, or handles with an explicit priority
+        if priority is None:
+            priority = item.total_cost
+        heapq.heappush(self.elements, (priority, self.counter, item))
         self.counter += 1
+        self.pushes += 1
+        return True
+
+    def improves(self, key, priority):
+        # Every add is kept, so the searcher allocates a path for every relaxation
+        return True
+
+    def queued(self, key):
+        # Item already waiting for key that an add would replace; never one here
+        return None
 
     def pop(self):
+        self.pops += 1
         return heapq.heappop(self.elements)[2]
 
     def is_empty(self):
         return len(self.elements) == 0
 
+class IndexedFrontierPQ:
+    # Indexed binary heap with one entry per key (node). Adding a key that is already
+    # in the heap lowers its priority with decrease_key, or is ignored if the new
+    # priority is not better, so the heap never holds stale entries.
+    def __init__(self):
+        self.heap = []        # Keys in heap order
+        self.position = {}    # Key -> index in self.heap
+        self.entries = {}     # Key -> (priority, counter, item)
+        self.counter = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.decreases = 0
+
+    def add(self, item, priority=None, key=None):
+        if priority is None:
+            priority = item.total_cost
+        if key is None:
+            key = item
+        if key in self.position:
+            if priority >= self.entries[key][0]:
+                return False
+            self.decrease_key(key, priority, item)
+            return True
+        self.entries[key] = (priority, self.counter, item)
+        self.counter += 1
+        self.position[key] = len(self.heap)
+        self.heap.append(key)
+        self.sift_up(len(self.heap) - 1)
+        self.pushes += 1
+        return True
+
+    def improves(self, key, priority):
+        # Whether add would accept the priority for key; check it before building the item
+        return key not in self.position or priority < self.entries[key][0]
+
+    def queued(self, key):
+        entry = self.entries.get(key)
+        return entry[2] if entry is not None else None
+
+    def decrease_key(self, key, priority, item):
+        self.entries[key] = (priority, self.counter, item)
+        self.counter += 1
+        self.sift_up(self.position[key])
+        self.decreases += 1
+
+    def pop(self):
+        heap = self.heap
+        key = heap[0]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self.position[last] = 0
+            self.sift_down(0)
+        del self.position[key]
+        self.pops += 1
+        return self.entries.pop(key)[2]
+
+    def is_empty(self):
+        return len(self.heap) == 0
+
+    def sift_up(self, i):
+        heap, position, entries = self.heap, self.position, self.entries
+        key = heap[i]
+        entry = entries[key][:2]
+        while i > 0:
+            parent = (i - 1) // 2
+            if entries[heap[parent]][:2] <= entry:
+                break
+            heap[i] = heap[parent]
+            position[heap[i]] = i
+            i = parent
+        heap[i] = key
+        position[key] = i
+
+    def sift_down(self, i):
+        heap, position, entries = self.heap, self.position, self.entries
+        size = len(heap)
+        key = heap[i]
+        entry = entries[key][:2]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and entries[heap[child + 1]][:2] < entries[heap[child]][:2]:
+                child += 1
+            if entry <= entries[heap[child]][:2]:
+                break
+            heap[i] = heap[child]
+            position[heap[i]] = i
+            i = child
+        heap[i] = key
+        position[key] = i
+
 # 6) Searcher
 
 class Searcher:
-    def __init__(self, problem):
+    # Uniform-cost search over the adjacency index of an explicit graph. The frontier
+    # holds integer handles into a PathStore, and a Path is built only for the
+    # solution that search() returns. frontier_class selects the lazy-deletion
+    # FrontierPQ or the decrease-key IndexedFrontierPQ.
+    # Any other Search_problem, including an explicit graph subclass that overrides
+    # is_goal or neighbors, is searched through is_goal and neighbors instead, with
+    # the PathStore keeping nodes and Edges (self.index is then None).
+    def __init__(self, problem, frontier_class=FrontierPQ):
         self.problem = problem
-        self.frontier = FrontierPQ()
-        self.frontier.add(Path(problem.start_node()))
+        self.index = problem.index if uses_index(problem) else None
+        self.paths = PathStore(self.index)
+        self.frontier = frontier_class()
         self.explored = set()
+        if self.index is None:
+            start = problem.start_node()
+            self.frontier.add(self.paths.add(-1, start), 0, start)
+            return
+        self.goal_ids = {self.index.node_id(goal) for goal in problem.goals} - {None}
+        start = self.index.node_id(problem.start_node())
+        if start is not None:
+            self.frontier.add(self.paths.add(-1, start), 0, start)
 
     def search(self):
+        if self.index is None:
+            return self.search_problem()
+        index, paths, explored = self.index, self.paths, self.explored
         while not self.frontier.is_empty():
-            path = self.frontier.pop()
-            node = path.node
+            handle = self.frontier.pop()
+            node = paths.nodes[handle]
+
+            if node in self.goal_ids:
+                return paths.to_path(handle)
+
+            if node in explored:
+                self.frontier.stale_pops += 1
+                continue
+
+            explored.add(node)
+            cost = paths.costs[handle]
+            for slot in range(index.offsets[node], index.offsets[node + 1]):
+                to_node = index.targets[slot]
+                if to_node not in explored:
+                    new_cost = cost + index.costs[slot]
+                    self.relax(handle, to_node, new_cost, slot=slot)
+
+        return None
+
+    def search_problem(self):
+        paths, explored = self.paths, self.explored
+        while not self.frontier.is_empty():
+            handle = self.frontier.pop()
+            node = paths.nodes[handle]
 
             if self.problem.is_goal(node):
-                return path
+                return paths.to_path(handle)
+
+            if node in explored:
+                self.frontier.stale_pops += 1
+                continue
+
+            explored.add(node)
+            cost = paths.costs[handle]
+            for edge in self.problem.neighbors(node):
+                to_node = edge.to_node
+                if to_node not in explored:
+                    self.relax(handle, to_node, cost + edge.cost, edge=edge)
+
+        return None
+
+    def relax(self, handle, to_node, new_cost, slot=-1, edge=None):
+        # Stores a path only when the frontier accepts it. With decrease-key the node's
+        # waiting path is rerouted in place, so the store holds one path per node.
+        priority = new_cost + self.heuristic(to_node)
+        if not self.frontier.improves(to_node, priority):
+            return
+        queued = self.frontier.queued(to_node)
+        if queued is None:
+            queued = self.paths.add(handle, to_node, slot, new_cost, edge)
+        else:
+            self.paths.replace(queued, handle, slot, new_cost, edge)
+        self.frontier.add(queued, priority, to_node)
+
+    def heuristic(self, node):
+        # Estimate added to a node's path cost for its frontier priority; 0 gives uniform-cost search
+        return 0
+
+def uses_index(problem):
+    # True when searching the CSR index directly gives the same answers as calling the
+    # problem's is_goal and neighbors, i.e. when neither is overridden
+    cls = type(problem)
+    return (isinstance(problem, Search_problem_from_explicit_graph)
+            and cls.is_goal is Search_problem_from_explicit_graph.is_goal
+            and cls.neighbors is Search_problem_from_explicit_graph.neighbors)
+
+# 7) Bulk Graph Loading and Binary Graph Files
+
+class IndexedHeuristic:
+    # Heuristic values stored in an array indexed by node id. Supports the same
+    # get(node, default) lookup as the heuristic dict of an explicit graph.
+    def __init__(self, index, values):
+        self.index = index
+        self.values = values
+
+    def get(self, node, default=0):
+        i = self.index.node_id(node)
+        return self.values[i] if i is not None else default
 
-            if node not in self.explored:
-                self.explored.add(node)
-                for edge in self.problem.neighbors(node):
-                    new_path = Path(edge.to_node, edge, path)
-                    self.frontier.add(new_path)
+    def __repr__(self):
+        return f"IndexedHeuristic({len(self.values)} values)"
+
+def load_edge_list(path, start, goals, title=None, delimiter=None):
+    # Streams a CSV/TSV edge list with rows "from, to, cost[, heuristic]" into a
+    # search problem, without creating an Edge object per row. The optional fourth
+    # column is the heuristic value of the "from" node. A header row is skipped.
+    if delimiter is None:
+        delimiter = '\t' if path.endswith(('.tsv', '.tab')) else ','
+
+    node_ids = {}
+    node_names = []
+    sources, targets, costs = array('q'), array('q'), array('d')
+    heuristics = array('d')
+    has_heuristic = False
+
+    def intern(name):
+        i = node_ids.get(name)
+        if i is None:
+            i = node_ids[name] = len(node_names)
+            node_names.append(name)
+            heuristics.append(0)
+        return i
+
+    with open(path, newline='') as file:
+        for row_number, row in enumerate(csv.reader(file, delimiter=delimiter)):
+            if not row:
+                continue
+            try:
+                cost = float(row[2])
+            except (IndexError, ValueError):
+                if row_number == 0:
+                    continue
+                raise ValueError(f"{path}:{row_number + 1}: expected 'from, to, cost[, heuristic]', got {row}")
+            assert cost >= 0, (f"Cost cannot be negative: {path}:{row_number + 1}, cost={cost}")
+            i = intern(row[0].strip())
+            sources.append(i)
+            targets.append(intern(row[1].strip()))
+            costs.append(cost)
+            if len(row) > 3 and row[3].strip():
+                heuristics[i] = float(row[3])
+                has_heuristic = True
+
+    goals = goal_set(goals)
+    for node in (start, *goals):
+        intern(node)
+
+    offsets, targets, costs, _ = build_csr(len(node_names), sources, targets, costs)
+    index = AdjacencyIndex(node_names, offsets, targets, costs)
+    heuristic = IndexedHeuristic(index, heuristics) if has_heuristic else None
+    return Search_problem_from_explicit_graph(title or path, None, None, start, goals, heuristic, index=index)
+
+# Binary graph file layout (little-endian, every section 8-byte aligned):
+#   header        magic b'SPGRAPH1', num_nodes, num_edges, name_bytes, has_heuristic
+#   offsets       int64[num_nodes + 1]
+#   targets       int64[num_edges]
+#   costs         float64[num_edges]
+#   name_offsets  int64[num_nodes + 1]
+#   heuristics    float64[num_nodes]      (only if has_heuristic)
+#   names         UTF-8 node names, concatenated
+# Node ids are assigned in sorted name order, so a name is found by binary search
+# over the mapped name table and nothing has to be decoded when the file is opened.
+
+GRAPH_MAGIC = b'SPGRAPH1'
+GRAPH_HEADER = struct.Struct('<8s4q')
 
+def save_graph_binary(problem, path):
+    index = problem.index
+    n = index.num_nodes()
+    encoded = [str(index.node_name(i)).encode('utf-8') for i in range(n)]
+    order = sorted(range(n), key=encoded.__getitem__)  # New id -> old id
+    new_id = array('q', bytes(8 * n))
+    for new, old in enumerate(order):
+        new_id[old] = new
+
+    offsets = array('q', [0])
+    targets, costs = array('q'), array('d')
+    name_offsets = array('q', [0])
+    heuristics = array('d')
+    for old in order:
+        for slot in range(index.offsets[old], index.offsets[old + 1]):
+            targets.append(new_id[index.targets[slot]])
+            costs.append(index.costs[slot])
+        offsets.append(len(targets))
+        name_offsets.append(name_offsets[-1] + len(encoded[old]))
+        heuristics.append(problem.heuristic(index.node_name(old)))
+    has_heuristic = any(heuristics)
+
+    sections = [offsets, targets, costs, name_offsets] + ([heuristics] if has_heuristic else [])
+    if sys.byteorder != 'little':
+        for section in sections:
+            section.byteswap()
+    with open(path, 'wb') as file:
+        file.write(GRAPH_HEADER.pack(GRAPH_MAGIC, n, len(targets), name_offsets[-1], int(has_heuristic)))
+        for section in sections:
+            section.tofile(file)
+        file.write(b''.join(encoded[old] for old in order))
+
+class MappedAdjacencyIndex(AdjacencyIndex):
+    # AdjacencyIndex whose arrays are views into a memory-mapped binary graph file.
+    # Opening is O(1) in the graph size, and processes mapping the same file share
+    # its pages through the OS page cache.
+    def __init__(self, path):
+        if sys.byteorder != 'little':
+            raise ValueError("Binary graph files can only be mapped on little-endian machines")
+        self.path = path
+        with open(path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, m, name_bytes, has_heuristic = GRAPH_HEADER.unpack_from(self.mmap)
+        if magic != GRAPH_MAGIC:
+            raise ValueError(f"{path} is not a binary graph file")
+
+        self.view = memoryview(self.mmap)
+        position = GRAPH_HEADER.size
+        def section(typecode, count):
+            nonlocal position
+            start, position = position, position + 8 * count
+            return self.view[start:position].cast(typecode)
+
+        self.offsets = section('q', n + 1)
+        self.targets = section('q', m)
+        self.costs = section('d', m)
+        self.name_offsets = section('q', n + 1)
+        self.heuristics = section('d', n) if has_heuristic else None
+        self.names = self.view[position:position + name_bytes]
+        self.count = n
+        self.edges = None
+        self.edge_ids = None
+        self.adjacency = {}
+        self.reverse = None
+
+    def num_nodes(self):
+        return self.count
+
+    def node_name(self, i):
+        return str(self.names[self.name_offsets[i]:self.name_offsets[i + 1]], 'utf-8')
+
+    def node_id(self, node):
+        key = str(node).encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            name = bytes(self.names[self.name_offsets[mid]:self.name_offsets[mid + 1]])
+            if name < key:
+                low = mid + 1
+            elif name == key:
+                return mid
+            else:
+                high = mid
         return None
 
+    def close(self):
+        # The array views have to be released before the mapping can be closed
+        self.adjacency = {}
+        for view in (self.offsets, self.targets, self.costs, self.name_offsets, self.heuristics, self.names, self.view):
+            if view is not None:
+                view.release()
+        self.mmap.close()
+
+def load_graph_binary(path, start, goals, title=None):
+    index = MappedAdjacencyIndex(path)
+    heuristic = IndexedHeuristic(index, index.heuristics) if index.heuristics is not None else None
+    return Search_problem_from_explicit_graph(title or path, None, None, start, goal_set(goals), heuristic, index=index)
+
+# 8) Shortest-Path-Tree Cache for Repeated Queries
+
+def dijkstra(offsets, targets, costs, num_nodes, source):
+    # Dijkstra's algorithm run to completion over CSR arrays. Returns the distance of
+    # every node (inf if unreachable), the previous node and the CSR slot of the edge
+    # into every node on its shortest path (-1 if none), and the number of nodes settled.
+    distances = array('d', [math.inf]) * num_nodes
+    parents = array('q', [-1]) * num_nodes
+    slots = array('q', [-1]) * num_nodes
+    settled = bytearray(num_nodes)
+    num_settled = 0
+
+    distances[source] = 0
+    frontier = [(0, source)]
+    while frontier:
+        cost, node = heapq.heappop(frontier)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        num_settled += 1
+        for slot in range(offsets[node], offsets[node + 1]):
+            to_node = targets[slot]
+            new_cost = cost + costs[slot]
+            if new_cost < distances[to_node]:
+                distances[to_node] = new_cost
+                parents[to_node] = node
+                slots[to_node] = slot
+                heapq.heappush(frontier, (new_cost, to_node))
+
+    return distances, parents, slots, num_settled
+
+class ShortestPathTree:
+    # Distances and parent edges of every node reachable from one source, computed by
+    # running Dijkstra's algorithm to completion. A route to any node is then read
+    # off the parent arrays in O(path length).
+    def __init__(self, index, source):
+        self.index = index
+        self.source = source
+        self.distances, self.parents, self.slots, self.num_settled = dijkstra(
+            index.offsets, index.targets, index.costs, index.num_nodes(), source)
+
+    def path_to(self, node):
+        if self.distances[node] == math.inf:
+            return None
+        edges = []
+        while node != self.source:
+            edges.append(self.index.edge(self.parents[node], self.slots[node]))
+            node = self.parents[node]
+        path = Path(self.index.node_name(self.source))
+        for edge in reversed(edges):
+            path = Path(edge.to_node, edge, path)
+        return path
+
+    def nearest(self, goals):
+        # The closest reachable node id among goals, or None
+        best = min(goals, key=self.distances.__getitem__, default=None)
+        if best is None or self.distances[best] == math.inf:
+            return None
+        return best
+
+class ShortestPathCache:
+    # LRU cache of shortest-path trees keyed by (graph version, source). A graph gets
+    # a new version whenever its edges change, so trees of an old version are never
+    # returned again and are evicted as the cache fills.
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.trees = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def tree(self, problem, source=None):
+        if source is None:
+            source = problem.start_node()
+        key = (problem.version, source)
+        tree = self.trees.get(key)
+        if tree is not None:
+            self.hits += 1
+            self.trees.move_to_end(key)
+            return tree
+
+        self.misses += 1
+        source_id = problem.index.node_id(source)
+        if source_id is None:
+            raise ValueError(f"{source} is not a node of {problem.title}")
+        tree = ShortestPathTree(problem.index, source_id)
+        self.trees[key] = tree
+        if len(self.trees) > self.maxsize:
+            self.trees.popitem(last=False)
+        return tree
+
+    def clear(self):
+        self.trees.clear()
+
+shortest_path_cache = ShortestPathCache()
+
+def single_source_search(problem, goals=None, source=None, cache=shortest_path_cache):
+    # Cheapest path from source (default: the start node) to the nearest of goals
+    # (default: the problem's goals), answered from a cached shortest-path tree
+    tree = cache.tree(problem, source)
+    goal_ids = {problem.index.node_id(goal) for goal in (problem.goals if goals is None else goals)} - {None}
+    goal = tree.nearest(goal_ids)
+    return tree.path_to(goal) if goal is not None else None
+
+# 9) ALT Landmark Heuristics and A* Search
+
+LANDMARKS_MAGIC = b'ALTLMK01'
+LANDMARKS_HEADER = struct.Struct('<8s2q')
+
+class Landmarks:
+    # ALT (A*, Landmarks, Triangle inequality) preprocessing. For each of K landmarks L,
+    # to_landmark[k*n + v] = d(v, L) and from_landmark[k*n + v] = d(L, v). By the
+    # triangle inequality d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) - d(t, L),
+    # so the largest of these bounds is an admissible and consistent heuristic.
+    def __init__(self, landmarks, from_landmark, to_landmark, num_nodes):
+        self.landmarks = landmarks
+        self.from_landmark = from_landmark
+        self.to_landmark = to_landmark
+        self.num_nodes = num_nodes
+
+    def heuristic(self, goals, index):
+        # Heuristic on node ids for reaching the nearest of the named goals
+        goal_ids = [i for i in (index.node_id(goal) for goal in goals) if i is not None]
+        n = self.num_nodes
+        from_landmark, to_landmark = self.from_landmark, self.to_landmark
+        offsets = [k * n for k in range(len(self.landmarks))]
+        values = {}
+
+        def lower_bound(node, goal):
+            best = 0
+            for offset in offsets:
+                forward = from_landmark[offset + goal] - from_landmark[offset + node]
+                backward = to_landmark[offset + node] - to_landmark[offset + goal]
+                # Bounds with an infinite term carry no information and are skipped
+                if forward > best and forward != math.inf:
+                    best = forward
+                if backward > best and backward != math.inf:
+                    best = backward
+            return best
+
+        def heuristic(node):
+            value = values.get(node)
+            if value is None:
+                value = min((lower_bound(node, goal) for goal in goal_ids), default=0)
+                values[node] = value
+            return value
+
+        return heuristic
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(LANDMARKS_HEADER.pack(LANDMARKS_MAGIC, len(self.landmarks), self.num_nodes))
+            for values in (array('q', self.landmarks), self.from_landmark, self.to_landmark):
+                values.tofile(file)
+
+def load_landmarks(path):
+    with open(path, 'rb') as file:
+        magic, k, n = LANDMARKS_HEADER.unpack(file.read(LANDMARKS_HEADER.size))
+        if magic != LANDMARKS_MAGIC:
+            raise ValueError(f"{path} is not a landmark file")
+        landmarks, from_landmark, to_landmark = array('q'), array('d'), array('d')
+        landmarks.fromfile(file, k)
+        from_landmark.fromfile(file, k * n)
+        to_landmark.fromfile(file, k * n)
+    return Landmarks(list(landmarks), from_landmark, to_landmark, n)
+
+def build_landmarks(problem, k=4, first=None):
+    # Picks k landmarks by farthest selection: each new landmark is the node whose
+    # distance to the closest landmark chosen so far is largest. The first one is
+    # `first` (default: the start node).
+    index = problem.index
+    n = index.num_nodes()
+    reverse_offsets, reverse_targets, reverse_costs, _ = index.reversed()
+    landmarks = []
+    from_landmark, to_landmark = array('d'), array('d')
+    closest = array('d', [math.inf]) * n
+
+    landmark = index.node_id(problem.start_node() if first is None else first)
+    while landmark is not None and len(landmarks) < min(k, n):
+        landmarks.append(landmark)
+        forward = dijkstra(index.offsets, index.targets, index.costs, n, landmark)[0]
+        backward = dijkstra(reverse_offsets, reverse_targets, reverse_costs, n, landmark)[0]
+        from_landmark.extend(forward)
+        to_landmark.extend(backward)
+
+        landmark, farthest = None, -1
+        for v in range(n):
+            closest[v] = min(closest[v], forward[v], backward[v])
+            distance = closest[v] if closest[v] != math.inf else 0  # Unconnected nodes make poor landmarks
+            if distance > farthest and v not in landmarks:
+                landmark, farthest = v, distance
+
+    return Landmarks(landmarks, from_landmark, to_landmark, n)
+
+class AStarSearcher(Searcher):
+    # A* search with FrontierPQ: the frontier is ordered by path cost plus a heuristic
+    # on node ids, such as Landmarks.heuristic. By default it uses the problem's own
+    # heuristic values.
+    def __init__(self, problem, heuristic=None, frontier_class=FrontierPQ):
+        super().__init__(problem, frontier_class)
+        if heuristic is None:
+            if self.index is None:
+                heuristic = problem.heuristic
+            else:
+                heuristic = lambda node: problem.heuristic(self.index.node_name(node))
+        self.heuristic = heuristic
+
+# 10) Bidirectional Uniform-Cost Search
+
+class BidirectionalSearcher:
+    # Bidirectional Dijkstra: a forward search from the start over the index and a
+    # backward search from all goals over the reverse index, always advancing the side
+    # whose frontier minimum is smaller. best_cost is the cheapest start-goal path seen
+    # through a node reached from both sides. Once the two frontier minima add up to at
+    # least best_cost, no unsettled path can be cheaper, so the search stops.
+    def __init__(self, problem):
+        self.problem = problem
+        self.index = problem.index
+        self.num_settled = 0
+
+    def search(self):
+        index = self.index
+        reverse_offsets, reverse_targets, reverse_costs, forward_slots = index.reversed()
+        start = index.node_id(self.problem.start_node())
+        goals = {index.node_id(goal) for goal in self.problem.goals} - {None}
+        if start is None or not goals:
+            return None
+        if start in goals:
+            return Path(index.node_name(start))
+
+        # For each side: distances, parents as (node, forward CSR slot), settled set, heap
+        forward = ({start: 0}, {}, set(), [(0, start)])
+        backward = ({goal: 0 for goal in goals}, {}, set(), [(0, goal) for goal in goals])
+        best_cost, meeting = math.inf, None
+
+        while forward[3] and backward[3]:
+            if forward[3][0][0] + backward[3][0][0] >= best_cost:
+                break
+            if forward[3][0][0] <= backward[3][0][0]:
+                side, other = forward, backward
+                offsets, targets, costs, slots = index.offsets, index.targets, index.costs, None
+            else:
+                side, other = backward, forward
+                offsets, targets, costs, slots = reverse_offsets, reverse_targets, reverse_costs, forward_slots
+            distances, parents, settled, frontier = side
+
+            cost, node = heapq.heappop(frontier)
+            if node in settled:
+                continue
+            settled.add(node)
+            self.num_settled += 1
+
+            for slot in range(offsets[node], offsets[node + 1]):
+                to_node = targets[slot]
+                new_cost = cost + costs[slot]
+                if new_cost < distances.get(to_node, math.inf):
+                    distances[to_node] = new_cost
+                    parents[to_node] = (node, slot if slots is None else slots[slot])
+                    heapq.heappush(frontier, (new_cost, to_node))
+                    total = new_cost + other[0].get(to_node, math.inf)
+                    if total < best_cost:
+                        best_cost, meeting = total, to_node
+
+        if meeting is None:
+            return None
+        return self.join(meeting, forward[1], backward[1])
+
+    def join(self, meeting, forward_parents, backward_parents):
+        # Forward half: walk the forward parents back to the start
+        index = self.index
+        edges = []
+        node = meeting
+        while node in forward_parents:
+            parent, slot = forward_parents[node]
+            edges.append(index.edge(parent, slot))
+            node = parent
+        edges.reverse()
+        # Backward half: the backward parent of a node is the next node towards a goal
+        node = meeting
+        while node in backward_parents:
+            next_node, slot = backward_parents[node]
+            edges.append(index.edge(node, slot))
+            node = next_node
+
+        path = Path(self.problem.start_node())
+        for edge in edges:
+            path = Path(edge.to_node, edge, path)
+        return path
+
+# 11) Parallel Batch Queries
+
+batch_problem = None  # The graph queried by this worker process, set by init_batch_worker
+
+def init_batch_worker(problem):
+    global batch_problem
+    batch_problem = problem
+
+def run_query(problem, task):
+    number, start, goals = task
+    path = BidirectionalSearcher(problem.with_query(start, goals)).search()
+    if path is None:
+        return number, None, None
+    return number, path.nodes(), path.get_total_cost()
+
+def run_batch_query(task):
+    return run_query(batch_problem, task)
+
+def batch_search(problem, queries, processes=None, chunksize=16):
+    # Answers (start, goal) queries against one graph with a process pool and yields
+    # (query number, route nodes, cost) tuples as they finish, not in query order.
+    # Workers are forked after the graph and its reverse index are built, so they
+    # share the arrays (or the mapped file) instead of receiving a pickled copy
+    # with every task; the pool initializer hands each worker the problem it
+    # inherited. Without fork, the queries run in this process.
+    problem.index.reversed()
+    tasks = ((number, start, goals) for number, (start, goals) in enumerate(queries))
+    if processes == 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        for task in tasks:
+            yield run_query(problem, task)
+        return
+    with multiprocessing.get_context('fork').Pool(processes, init_batch_worker, (problem,)) as pool:
+        yield from pool.imap_unordered(run_batch_query, tasks, chunksize)
+
 #Dijkstra search for problem1
 print("Paths for problem 1 using Dijkstra's algorithm")
 searcher1 = Searcher(problem1)
@@ -174,3 +1075,68 @@ result = searcher3.search()
 if result:
     print("Path:", result.get_full_path())
     print("Total Cost:", result.get_total_cost())
+
+# Loading problem 3 from an edge list file and from a memory-mapped binary graph file
+print("\nPaths for problem 3 loaded from an edge list and a binary graph file")
+with tempfile.TemporaryDirectory() as directory:
+    edge_list_path = os.path.join(directory, 'problem3.csv')
+    with open(edge_list_path, 'w') as file:
+        file.write("from,to,cost\n")
+        for edge in problem3.edges:
+            file.write(f"{edge.from_node},{edge.to_node},{edge.cost}\n")
+    loaded_problem = load_edge_list(edge_list_path, start='A', goals={'J'}, title='Problem 3 (edge list)')
+    result = Searcher(loaded_problem).search()
+    print("Edge list path:", result.get_full_path(), "| Total Cost:", result.get_total_cost())
+
+    binary_path = os.path.join(directory, 'problem3.graph')
+    save_graph_binary(loaded_problem, binary_path)
+    mapped_problem = load_graph_binary(binary_path, start='A', goals={'J'}, title='Problem 3 (binary)')
+    result = Searcher(mapped_problem).search()
+    print("Binary graph path:", result.get_full_path(), "| Total Cost:", result.get_total_cost())
+    mapped_problem.index.close()
+
+# Frontier counters for the lazy-deletion heap and the decrease-key heap on problem 3
+print("\nFrontier operations for problem 3")
+for frontier_class in (FrontierPQ, IndexedFrontierPQ):
+    searcher = Searcher(problem3, frontier_class)
+    result = searcher.search()
+    frontier = searcher.frontier
+    print(f"{frontier_class.__name__}: {result.get_full_path()} (cost {result.get_total_cost()}), "
+          f"pushes={frontier.pushes}, pops={frontier.pops}, stale pops={frontier.stale_pops}")
+
+# Many goal queries from the same start, answered from one cached shortest-path tree
+print("\nSingle-source queries for problem 3 from A")
+for goals in ({'J'}, {'G'}, {'E', 'H'}):
+    result = single_source_search(problem3, goals)
+    print(f"Goals {sorted(goals)}: {result.get_full_path()} (cost {result.get_total_cost()})")
+problem3.add_edges([Edge('A', 'G', 5)])
+result = single_source_search(problem3, {'G'})
+print(f"After adding A -> G: {result.get_full_path()} (cost {result.get_total_cost()})")
+print(f"Cache hits: {shortest_path_cache.hits}, misses: {shortest_path_cache.misses}")
+
+# A* with landmark heuristics on a 30x30 grid road network
+print("\nUniform-cost search vs. ALT A* on a 30x30 grid")
+rng = random.Random(0)
+grid_edges = []
+for x in range(30):
+    for y in range(30):
+        for dx, dy in ((1, 0), (0, 1)):
+            if x + dx < 30 and y + dy < 30:
+                cost = rng.randint(1, 9)
+                grid_edges += [Edge((x, y), (x + dx, y + dy), cost), Edge((x + dx, y + dy), (x, y), cost)]
+grid = Search_problem_from_explicit_graph('Grid', set(), grid_edges, start=(0, 0), goals={(29, 29)})
+grid_landmarks = build_landmarks(grid, k=4)
+for name, searcher in (("UCS", Searcher(grid)), ("ALT A*", AStarSearcher(grid, grid_landmarks.heuristic(grid.goals, grid.index)))):
+    result = searcher.search()
+    print(f"{name}: cost {result.get_total_cost()}, nodes expanded {len(searcher.explored)}")
+bidirectional = BidirectionalSearcher(grid)
+result = bidirectional.search()
+print(f"Bidirectional UCS: cost {result.get_total_cost()}, nodes settled {bidirectional.num_settled}")
+
+# A batch of grid queries spread over a process pool
+print("\nBatch of 200 grid queries on a process pool")
+queries = [((rng.randrange(30), rng.randrange(30)), (rng.randrange(30), rng.randrange(30))) for _ in range(200)]
+results = sorted(batch_search(grid, queries, processes=4))
+print(f"Answered {len(results)} queries, total cost {sum(cost for _, _, cost in results)}")
+number, route, cost = results[0]
+print(f"Query 0 {queries[0]}: {len(route) - 1} edges, cost {cost}")